@@ -1,18 +1,19 @@
+import time
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 
+INICIO_EXECUCAO = time.perf_counter()
+
 # Imports dos módulos
-from modules.config import ICONS, COLORS
+from modules.config import ICONS, COLORS, LOG_TEMPOS_JSON
 from modules.styles import apply_premium_css
-from modules.utils import load_logo, format_currency
-from modules.data_loader import load_data, carregar_ativacoes
-
-# Imports das views
-from views.previsao import render_previsao
-from views.consolidado import render_consolidado
-from views.mix_produtos import render_mix_produtos
-from views.ativacoes import render_ativacoes
+from modules.utils import format_currency
+from modules.ativos import url_ativo
+from modules.data_loader import load_data, obter_cubo
+from modules.cubo import consultar_cubo, total_cubo, distintos_cubo
+from modules.paginas import PAGINAS, renderizar_pagina, renderizar_painel_debug
+from modules.instrumentacao import iniciar_execucao, configurar_log_json
 
 # ==================== CONFIGURAÇÃO DA PÁGINA ====================
 st.set_page_config(
@@ -22,6 +23,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ==================== INSTRUMENTAÇÃO ====================
+iniciar_execucao()
+if LOG_TEMPOS_JSON:
+    configurar_log_json()
+
 # ==================== APLICAR CSS ====================
 apply_premium_css()
 
@@ -29,17 +35,18 @@ apply_premium_css()
 if 'pagina_atual' not in st.session_state:
     st.session_state.pagina_atual = 'previsao'
 
-if 'df_base' not in st.session_state:
-    st.session_state.df_base = load_data()
+# Base de faturamento somente leitura, a mesma instância para todas as sessões
+with st.spinner("Carregando base de faturamento..."):
+    df_base = load_data()
 
 # ==================== SIDEBAR ====================
 with st.sidebar:
-    # Logo
-    logo_base64 = load_logo()
-    if logo_base64:
+    # Logo (servida por URL de static/, preparada uma vez por processo)
+    logo_url = url_ativo('logo.gif')
+    if logo_url:
         st.markdown(f"""
             <div style='text-align: center; padding: 1.5rem 0 2rem 0;'>
-                <img src='data:image/gif;base64,{logo_base64}' style='max-width: 280px; filter: drop-shadow(0 4px 8px rgba(0,0,0,0.1));'>
+                <img src='{logo_url}' style='max-width: 280px; filter: drop-shadow(0 4px 8px rgba(0,0,0,0.1));'>
             </div>
         """, unsafe_allow_html=True)
     else:
@@ -59,22 +66,15 @@ with st.sidebar:
         </div>
     """, unsafe_allow_html=True)
 
-    # Menu de navegação
-    menu_options = {
-        'previsao': ('calendar', 'Previsão de Faturamento'),
-        'ativacoes': ('users', 'Ativações em Andamento'),
-        'mix': ('pie_chart', 'Mix de Produtos'),
-        'consolidado': ('bar_chart', 'Consolidado & Projeção')
-    }
-
-    for key, (icon, label) in menu_options.items():
-        if st.button(f"{label}", key=f"btn_{key}", use_container_width=True):
+    # Menu de navegação (views importadas só na primeira visita)
+    for key, pagina in PAGINAS.items():
+        if st.button(pagina['titulo'], key=f"btn_{key}", use_container_width=True):
             st.session_state.pagina_atual = key
 
     st.markdown("---")
 
     # Informações da base
-    if not st.session_state.df_base.empty:
+    if not df_base.empty:
         st.markdown(f"""
             <div style='margin-bottom: 1rem;'>
                 <h3 style='font-family: Sora; font-size: 0.95rem; font-weight: 700; color: {COLORS['primary']};'>
@@ -83,18 +83,18 @@ with st.sidebar:
             </div>
         """, unsafe_allow_html=True)
         
-        df = st.session_state.df_base
+        cubo = obter_cubo(df_base)
 
-        total_fat = df['Vlr Valido'].sum()
-        qtd_clientes = df['GRUPO CLIENTE'].nunique()
-        qtd_servicos = df['tpServ'].nunique()
+        total_fat = total_cubo(cubo)
+        qtd_clientes = distintos_cubo(cubo, 'GRUPO CLIENTE')
+        qtd_servicos = distintos_cubo(cubo, 'tpServ')
 
         st.metric("Faturamento Total", format_currency(total_fat))
         st.metric("Clientes Ativos", qtd_clientes)
         st.metric("Tipos de Serviços", qtd_servicos)
 
         # Período da base
-        periodos = sorted(df['Periodo'].unique())
+        periodos = consultar_cubo(cubo, ['PERIODO_ORD', 'Periodo'])['Periodo'].tolist()
         st.markdown(f"""
             <div style='margin-top: 1rem; padding: 0.75rem; background: {COLORS['light']}; border-radius: 8px; border-left: 3px solid {COLORS['secondary']};'>
                 <div style='font-size: 0.75rem; color: {COLORS['gray']}; font-weight: 600; text-transform: uppercase; letter-spacing: 0.5px;'>Período</div>
@@ -113,20 +113,12 @@ with st.sidebar:
     """, unsafe_allow_html=True)
 
 # ==================== ROTEAMENTO DE PÁGINAS ====================
-df = st.session_state.df_base
-df_ativacoes = carregar_ativacoes()
-
-if st.session_state.pagina_atual == 'previsao':
-    render_previsao(df, df_ativacoes)
-
-elif st.session_state.pagina_atual == 'ativacoes':
-    render_ativacoes(df_ativacoes)
-
-elif st.session_state.pagina_atual == 'mix':
-    render_mix_produtos(df)
+# Cada página carrega só as bases que declara em modules/paginas.py
+renderizar_pagina(st.session_state.pagina_atual, INICIO_EXECUCAO)
 
-elif st.session_state.pagina_atual == 'consolidado':
-    render_consolidado(df)
+# Etapas desta execução, tempos por página e perfil sob demanda (?debug=1 na URL)
+if 'debug' in st.query_params:
+    renderizar_painel_debug()
 
 # ==================== FOOTER ====================
 st.markdown("---")
@@ -0,0 +1,62 @@
+import json
+import sys
+import time
+import numpy as np
+import pandas as pd
+from modules.utils import (format_currency, format_number, format_percentage,
+                           format_currency_serie, format_number_serie, format_percentage_serie)
+
+# ==================== BENCHMARK DOS FORMATADORES ====================
+# Compara a versão escalar (aplicada com Series.map) com a versão em lote
+# e confere que as duas produzem exatamente os mesmos textos. Roda com valores
+# todos distintos, com valores repetidos (como MRRs e células zeradas do pivot)
+# e com valores especiais (±inf, fora do int64, zero negativo).
+# Uso: python -m benchmarks.formatadores [linhas]
+
+# Casos de borda da paridade (NaN fica de fora: o lote usa `na_rep` de propósito)
+VALORES_ESPECIAIS = [np.inf, -np.inf, 1e20, -1e20, 2.0 ** 63, -2.0 ** 63, 9.2e18,
+                     0.0, -0.0, -0.4, 0.5, -1e-9]
+
+PARES = [
+    ('moeda', format_currency, format_currency_serie),
+    ('numero', format_number, format_number_serie),
+    ('percentual', format_percentage, format_percentage_serie),
+]
+
+def _cronometrar(funcao, repeticoes):
+    """Melhor tempo (s) entre as repetições"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+def comparar_formatadores(linhas=100_000, repeticoes=3, semente=0):
+    """Tempo escalar x lote para cada formatador"""
+    rng = np.random.default_rng(semente)
+    cenarios = {
+        'distintos': pd.Series(rng.normal(50_000, 250_000, linhas)),
+        'repetidos': pd.Series(rng.choice(rng.normal(50_000, 250_000, 2_000).round(2), linhas)),
+        'especiais': pd.Series(np.resize(VALORES_ESPECIAIS, linhas)),
+    }
+
+    resultados = []
+    for cenario, serie in cenarios.items():
+        for nome, escalar, lote in PARES:
+            t_escalar, esperado = _cronometrar(lambda: serie.map(escalar), repeticoes)
+            t_lote, obtido = _cronometrar(lambda: lote(serie), repeticoes)
+            resultados.append({
+                'formatador': nome,
+                'cenario': cenario,
+                'linhas': linhas,
+                'escalar_s': round(t_escalar, 4),
+                'lote_s': round(t_lote, 4),
+                'aceleracao': round(t_escalar / t_lote, 2) if t_lote > 0 else None,
+                'saida_identica': bool(esperado.equals(obtido)),
+            })
+    return resultados
+
+if __name__ == '__main__':
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(json.dumps(comparar_formatadores(linhas), indent=2, ensure_ascii=False))
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from modules import nucleo
+from benchmarks.sintetico import gerar_planilhas
+
+# ==================== MEMÓRIA POR SESSÃO ====================
+# Custo de memória de N sessões segurando a base de faturamento. Antes, cada
+# sessão guardava no session_state a cópia que o st.cache_data devolve a cada
+# chamada (pickle do resultado); agora todas referenciam o mesmo DataFrame
+# somente leitura do st.cache_resource.
+# Uso: python -m benchmarks.memoria_sessoes --linhas 100000 --sessoes 10
+
+def memoria_por_sessao(obter, sessoes):
+    """Bytes alocados por sessão ao obter e guardar a base (o cache já aquecido não entra na conta)"""
+    obter()
+    tracemalloc.start()
+    try:
+        inicio = tracemalloc.get_traced_memory()[0]
+        guardadas = [obter() for _ in range(sessoes)]
+        alocado = tracemalloc.get_traced_memory()[0] - inicio
+    finally:
+        tracemalloc.stop()
+    del guardadas
+    return alocado / sessoes
+
+def colunas_gravaveis(df):
+    """Colunas de `df` que aceitam escrita (regrava o valor da primeira linha; só para conferência)"""
+    gravaveis = []
+    if df.empty:
+        return gravaveis
+    for posicao, nome in enumerate(df.columns):
+        try:
+            df.iloc[0, posicao] = df.iloc[0, posicao]
+        except Exception:
+            continue
+        gravaveis.append(nome)
+    return gravaveis
+
+def comparar_sessoes(df, sessoes):
+    """Relatório antes (cache_data, cópia por sessão) x depois (cache_resource, compartilhada)
+
+    Fora do runtime do Streamlit os decoradores não copiam nada, então o
+    comportamento deles dentro do app é reproduzido: o st.cache_data guarda o
+    resultado serializado e devolve um `pickle.loads` a cada acerto; o
+    st.cache_resource devolve sempre o mesmo objeto.
+    """
+    # Medido antes de congelar: memory_usage(deep=True) não lê arrays de objetos somente leitura
+    mb = 2**20
+    tamanho = df.memory_usage(deep=True).sum()
+    serializada = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    antes = memoria_por_sessao(lambda: pickle.loads(serializada), sessoes)
+    compartilhada = nucleo.congelar(df)
+    depois = memoria_por_sessao(lambda: compartilhada, sessoes)
+    return {
+        'linhas': len(df),
+        'sessoes': sessoes,
+        'base_mb': round(tamanho / mb, 2),
+        'antes': {'mb_por_sessao': round(antes / mb, 3), 'mb_total': round(antes * sessoes / mb, 2)},
+        'depois': {'mb_por_sessao': round(depois / mb, 3), 'mb_total': round(depois * sessoes / mb, 2),
+                   # Conferido numa cópia congelada à parte, sem escrever na compartilhada
+                   'colunas_gravaveis': colunas_gravaveis(nucleo.congelar(df))},
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.memoria_sessoes',
+                                     description='Memória por sessão da base de faturamento: cópia x compartilhada.')
+    parser.add_argument('--linhas', type=int, default=100_000)
+    parser.add_argument('--clientes', type=int, default=500)
+    parser.add_argument('--sessoes', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    dados = tempfile.mkdtemp(prefix='bench-telco-')
+    diretorio_original = os.getcwd()
+    try:
+        caminhos = gerar_planilhas(dados, args.linhas, args.clientes, ativacoes=10)
+        # Cache em disco isolado no diretório dos dados, sem tocar no .cache do projeto
+        os.chdir(dados)
+        df = nucleo.carregar_faturamento(caminhos['faturamento'], caminhos['diretorio_faturamento'])
+    finally:
+        os.chdir(diretorio_original)
+        shutil.rmtree(dados, ignore_errors=True)
+
+    json.dump(comparar_sessoes(df, args.sessoes), sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from modules.periodos import MESES_NOME
+
+# ==================== DADOS SINTÉTICOS ====================
+# Planilhas com o formato de BD-FATURAMENTO.xlsx e EM-ATIVACAO.xlsx em escala
+# configurável, para os benchmarks. Metade das ativações é de clientes da base
+# (com variações de caixa e acento, como nas planilhas reais) e metade de
+# clientes novos. Acima do limite de linhas de uma aba do Excel, a base é
+# gravada em várias planilhas em `faturamento/` (lidas por modules.multiarquivo).
+# Uso: python -m benchmarks.sintetico <diretorio> [escala]
+
+ESCALAS = {
+    'pequena': {'linhas': 10_000, 'clientes': 100, 'ativacoes': 10},
+    'media': {'linhas': 200_000, 'clientes': 2_000, 'ativacoes': 500},
+    'grande': {'linhas': 1_000_000, 'clientes': 10_000, 'ativacoes': 2_000},
+    'maxima': {'linhas': 5_000_000, 'clientes': 50_000, 'ativacoes': 10_000},
+}
+
+# Limite de 1.048.576 linhas por aba do Excel, com folga para o cabeçalho
+LINHAS_POR_PLANILHA = 1_000_000
+
+SERVICOS = {'CLDPBX': 'Cloud PBX', 'TOIP': 'Voz', 'VIDEO': 'Videoconferência',
+            'CCENTER': 'Contact Center', 'IP': 'Link IP', 'OUT': 'Outros'}
+PESOS_SERVICOS = [0.31, 0.21, 0.21, 0.15, 0.10, 0.02]
+PRODUTOS = ['CLOUD PBX', 'TOIP', 'CONTACT CENTER / CRM', 'VIDEOCONFERÊNCIA', 'LINK IP']
+STATUS = ['EM ANDAMENTO', 'AGUARDANDO CLIENTE', 'PAUSADO']
+PESOS_STATUS = [0.7, 0.2, 0.1]
+
+def nomes_clientes(quantidade):
+    """Nomes de clientes distintos, alguns com acento"""
+    nomes = np.array([f'CLIENTE {i:05d}' for i in range(quantidade)], dtype=object)
+    nomes[::17] = [f'TELECOMUNICAÇÕES {i:05d}' for i in range(0, quantidade, 17)]
+    return nomes
+
+def gerar_faturamento(linhas, clientes, meses=24, ultimo_ano=2026, ultimo_mes=1, semente=0):
+    """Base no formato da aba de BD-FATURAMENTO (colunas usadas e algumas das demais)"""
+    rng = np.random.default_rng(semente)
+    nomes = nomes_clientes(clientes)
+    # Clientes com tamanhos diferentes: poucos grandes, muitos pequenos
+    pesos = rng.pareto(1.5, clientes) + 1
+    pesos /= pesos.sum()
+
+    ultimo = ultimo_ano * 12 + ultimo_mes - 1
+    ordinais = np.sort(rng.integers(ultimo - meses + 1, ultimo + 1, linhas))
+    anos, meses_num = ordinais // 12, ordinais % 12 + 1
+    servicos = rng.choice(list(SERVICOS), linhas, p=PESOS_SERVICOS)
+    grupos = rng.choice(nomes, linhas, p=pesos)
+    valores = np.round(rng.lognormal(7, 1.2, linhas), 2)
+
+    return pd.DataFrame({
+        'Filial': rng.choice(np.array(['B1', 'B2', 'S1'], dtype=object), linhas),
+        'Conta': '3.1.1.2.01.0001',
+        'Data': pd.to_datetime({'year': anos, 'month': meses_num, 'day': 1}),
+        'Documento': np.char.zfill(rng.integers(1, 999_999, linhas).astype(str), 6).astype(object),
+        'Vlr Valido': valores,
+        'MÊS': meses_num,
+        'Descrição': np.array(MESES_NOME, dtype=object)[meses_num],
+        'ANO': anos,
+        'D/C': 'C',
+        'tpServ': servicos,
+        'Descrição Tipos de Serviços': pd.Series(servicos).map(SERVICOS).to_numpy(),
+        'GRUPO CLIENTE': grupos,
+    })
+
+def gerar_ativacoes(quantidade, nomes_base, ultimo_ano=2026, ultimo_mes=1, semente=0):
+    """Aba EM ATIVAÇÃO: metade de clientes da base (grafia variada), metade de clientes novos"""
+    rng = np.random.default_rng(semente + 1)
+    existentes = rng.choice(np.asarray(nomes_base, dtype=object), quantidade // 2)
+    existentes = [nome.lower() if i % 3 == 0 else nome.title() if i % 3 == 1 else nome
+                  for i, nome in enumerate(existentes)]
+    novos = [f'NOVO CLIENTE {i:05d}' for i in range(quantidade - len(existentes))]
+    clientes = np.array(existentes + novos, dtype=object)
+    rng.shuffle(clientes)
+
+    inicio_mes = pd.Timestamp(ultimo_ano, ultimo_mes, 1)
+    previstas = inicio_mes + pd.to_timedelta(rng.integers(-60, 300, quantidade), unit='D')
+    return pd.DataFrame({
+        'CLIENTE': clientes,
+        'UNIDADE': rng.choice(np.array(['MATRIZ', 'FILIAL', '3 UNIDADES'], dtype=object), quantidade),
+        'PRODUTO': rng.choice(np.array(PRODUTOS, dtype=object), quantidade),
+        'DATA DE INICIO': previstas - pd.to_timedelta(rng.integers(30, 240, quantidade), unit='D'),
+        'DATA PREVISTA': previstas,
+        '% CONCLUÍDO': np.round(rng.uniform(0, 1, quantidade), 2),
+        'VALOR TOTAL': rng.integers(500, 30_000, quantidade),
+        'STATUS': rng.choice(np.array(STATUS, dtype=object), quantidade, p=PESOS_STATUS),
+    })
+
+def gravar_planilhas(diretorio, faturamento, ativacoes):
+    """Grava as planilhas e devolve os caminhos no formato aceito por `nucleo.carregar_*`
+
+    Bases maiores que uma aba do Excel vão para `diretorio/faturamento/` em várias planilhas.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminhos = {
+        'faturamento': os.path.join(diretorio, 'BD-FATURAMENTO.xlsx'),
+        'diretorio_faturamento': None,
+        'ativacoes': os.path.join(diretorio, 'EM-ATIVACAO.xlsx'),
+    }
+    if len(faturamento) <= LINHAS_POR_PLANILHA:
+        faturamento.to_excel(caminhos['faturamento'], index=False)
+    else:
+        caminhos['diretorio_faturamento'] = os.path.join(diretorio, 'faturamento')
+        os.makedirs(caminhos['diretorio_faturamento'], exist_ok=True)
+        for parte, inicio in enumerate(range(0, len(faturamento), LINHAS_POR_PLANILHA), start=1):
+            faturamento.iloc[inicio:inicio + LINHAS_POR_PLANILHA].to_excel(
+                os.path.join(caminhos['diretorio_faturamento'], f'BD-FATURAMENTO-{parte:02d}.xlsx'), index=False)
+    with pd.ExcelWriter(caminhos['ativacoes']) as escritor:
+        ativacoes.to_excel(escritor, sheet_name='EM ATIVAÇÃO', index=False)
+    return caminhos
+
+def gerar_planilhas(diretorio, linhas, clientes, ativacoes, semente=0):
+    """Gera e grava as duas bases sintéticas"""
+    faturamento = gerar_faturamento(linhas, clientes, semente=semente)
+    df_ativacoes = gerar_ativacoes(ativacoes, nomes_clientes(clientes), semente=semente)
+    return gravar_planilhas(diretorio, faturamento, df_ativacoes)
+
+if __name__ == '__main__':
+    escala = ESCALAS[sys.argv[2] if len(sys.argv) > 2 else 'pequena']
+    print(json.dumps(gerar_planilhas(sys.argv[1] if len(sys.argv) > 1 else 'dados_sinteticos', **escala),
+                     indent=2, ensure_ascii=False))
@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from modules import nucleo
+from modules.cache_disco import DIRETORIO_CACHE
+from modules.cubo import construir_cubo
+from modules.motor_previsao import gerar_previsao_com_ativacoes
+from modules.cenarios import totais_cenarios
+from modules.config import CENARIOS_PADRAO
+from modules.monte_carlo import simular_monte_carlo
+from modules.tabelas import montar_tabela_html
+from modules.utils import format_currency_serie
+from benchmarks.sintetico import ESCALAS, gerar_planilhas
+from views.previsao import montar_pivot_previsao, montar_html_tabela_previsao
+
+# ==================== SUÍTE DE BENCHMARKS ====================
+# Tempo e pico de memória das etapas pesadas do dashboard sobre dados
+# sintéticos: carga das bases (fria e com cache em disco), cubo, previsão,
+# pivot da Previsão e tabelas HTML. O resultado vai para JSON e pode ser
+# comparado com o de uma versão anterior para detectar regressões.
+# Uso: python -m benchmarks.suite --escala media --saida atual.json --comparar anterior.json
+
+VERSAO_SUITE = 1
+MESES_PREVISAO = 12
+TOP_CLIENTES = 15
+SIMULACOES = 10_000
+
+def medir(funcao, repeticoes=3, preparar=None):
+    """Melhor tempo entre as repetições e pico de memória (tracemalloc) de uma execução à parte
+
+    O tracemalloc deixa a execução mais lenta, por isso não entra no tempo.
+    Alocações feitas fora do alocador do Python/NumPy (ex.: pyarrow) não são contadas.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    if preparar:
+        preparar()
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, {
+        'segundos': round(min(tempos), 4),
+        'segundos_mediana': round(float(np.median(tempos)), 4),
+        'pico_memoria_mb': round(pico / 2**20, 2),
+    }
+
+def _limpar_cache_disco():
+    shutil.rmtree(DIRETORIO_CACHE, ignore_errors=True)
+
+def _tabela_ativacoes(df_ativacoes):
+    """Tabela da página de Ativações (colunas já formatadas), para o construtor HTML genérico"""
+    return pd.DataFrame({
+        'CLIENTE': df_ativacoes['CLIENTE'],
+        'PRODUTO': df_ativacoes['PRODUTO'],
+        'DATA_PREVISTA_FMT': df_ativacoes['DATA_PREVISTA'].dt.strftime('%d/%m/%Y'),
+        'VALOR_MRR_FMT': format_currency_serie(df_ativacoes['VALOR_MRR']),
+        'STATUS': df_ativacoes['STATUS'],
+    })
+
+def executar_suite(caminhos, repeticoes=3):
+    """Roda cada benchmark sobre as planilhas em `caminhos`, com o cache em disco no diretório atual"""
+    resultados = []
+
+    def registrar(nome, funcao, preparar=None, **detalhes):
+        resultado, medidas = medir(funcao, repeticoes, preparar)
+        resultados.append({'nome': nome, **medidas, **detalhes})
+        return resultado
+
+    carregar_base = lambda: nucleo.carregar_faturamento(caminhos['faturamento'], caminhos['diretorio_faturamento'])
+    carregar_ativ = lambda: nucleo.carregar_ativacoes(caminhos['ativacoes'])
+
+    df = registrar('load_data (sem cache)', carregar_base, preparar=_limpar_cache_disco)
+    registrar('load_data (cache em disco)', carregar_base)
+    df_ativacoes = registrar('carregar_ativacoes (sem cache)', carregar_ativ, preparar=_limpar_cache_disco)
+
+    cubo = registrar('construir_cubo', lambda: construir_cubo(df))
+    previsao = registrar('gerar_previsao_com_ativacoes',
+                         lambda: gerar_previsao_com_ativacoes(df, df_ativacoes, MESES_PREVISAO),
+                         meses=MESES_PREVISAO)
+    registrar('cenários', lambda: totais_cenarios(df, df_ativacoes, CENARIOS_PADRAO, MESES_PREVISAO),
+              cenarios=len(CENARIOS_PADRAO), meses=MESES_PREVISAO)
+    registrar('monte carlo', lambda: simular_monte_carlo(df, df_ativacoes, MESES_PREVISAO, simulacoes=SIMULACOES),
+              simulacoes=SIMULACOES, meses=MESES_PREVISAO)
+
+    top = cubo.groupby('GRUPO CLIENTE', observed=True)['Vlr Valido'].sum().nlargest(TOP_CLIENTES).index
+    df_pivot, periodos_reais = registrar(
+        'pivot da Previsão', lambda: montar_pivot_previsao(cubo, previsao, df_ativacoes, top), top_n=TOP_CLIENTES)
+    registrar('tabela HTML da Previsão',
+              lambda: montar_html_tabela_previsao.__wrapped__(df_pivot, periodos_reais),
+              linhas=df_pivot.shape[0], colunas=df_pivot.shape[1])
+    tabela = _tabela_ativacoes(df_ativacoes)
+    registrar('tabela HTML das Ativações', lambda: montar_tabela_html(tabela), linhas=len(tabela))
+    return resultados
+
+def comparar_resultados(atual, anterior, tolerancia=0.10, folga_segundos=0.005):
+    """Razão atual/anterior de tempo e memória por benchmark; marca regressões acima da tolerância
+
+    Etapas de poucos milissegundos variam muito entre execuções: o tempo só conta
+    como regressão se também aumentar mais que `folga_segundos`.
+    """
+    anteriores = {r['nome']: r for r in anterior['resultados']}
+    comparacao = []
+    for resultado in atual['resultados']:
+        base = anteriores.get(resultado['nome'])
+        if not base:
+            continue
+        razao_tempo = resultado['segundos'] / base['segundos'] if base['segundos'] else None
+        razao_memoria = (resultado['pico_memoria_mb'] / base['pico_memoria_mb']
+                         if base['pico_memoria_mb'] else None)
+        comparacao.append({
+            'nome': resultado['nome'],
+            'razao_tempo': round(razao_tempo, 3) if razao_tempo is not None else None,
+            'razao_memoria': round(razao_memoria, 3) if razao_memoria is not None else None,
+            'regressao': ((razao_tempo is not None and razao_tempo > 1 + tolerancia
+                           and resultado['segundos'] - base['segundos'] > folga_segundos)
+                          or (razao_memoria is not None and razao_memoria > 1 + tolerancia)),
+        })
+    return comparacao
+
+def _ambiente():
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite',
+                                     description='Benchmarks das etapas pesadas sobre dados sintéticos.')
+    parser.add_argument('--escala', choices=ESCALAS, default='pequena')
+    parser.add_argument('--linhas', type=int, help='linhas de faturamento (sobrepõe a escala)')
+    parser.add_argument('--clientes', type=int, help='clientes distintos (sobrepõe a escala)')
+    parser.add_argument('--ativacoes', type=int, help='ativações em andamento (sobrepõe a escala)')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--dados', help='diretório das planilhas sintéticas (reaproveitadas se já existirem)')
+    parser.add_argument('--saida', help='arquivo JSON de resultados (padrão: stdout)')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior para detectar regressões')
+    parser.add_argument('--tolerancia', type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    escala = dict(ESCALAS[args.escala])
+    for parametro in escala:
+        if getattr(args, parametro) is not None:
+            escala[parametro] = getattr(args, parametro)
+
+    temporario = args.dados is None
+    dados = os.path.abspath(args.dados or tempfile.mkdtemp(prefix='bench-telco-'))
+    diretorio_dados = os.path.join(dados, '{linhas}-{clientes}-{ativacoes}'.format(**escala))
+    marcador = os.path.join(diretorio_dados, 'planilhas.json')
+    inicio = time.perf_counter()
+    if os.path.exists(marcador):
+        with open(marcador, encoding='utf-8') as f:
+            caminhos = json.load(f)
+    else:
+        caminhos = gerar_planilhas(diretorio_dados, **escala)
+        with open(marcador, 'w', encoding='utf-8') as f:
+            json.dump(caminhos, f)
+    geracao = round(time.perf_counter() - inicio, 2)
+
+    # Cache em disco isolado no diretório dos dados, sem tocar no .cache do projeto
+    diretorio_original = os.getcwd()
+    os.chdir(diretorio_dados)
+    try:
+        resultados = executar_suite(caminhos, args.repeticoes)
+    finally:
+        os.chdir(diretorio_original)
+        if temporario:
+            shutil.rmtree(dados, ignore_errors=True)
+
+    relatorio = {
+        'versao_suite': VERSAO_SUITE,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': _ambiente(),
+        'escala': {'nome': args.escala, **escala},
+        'geracao_dados_s': geracao,
+        'resultados': resultados,
+    }
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            relatorio['comparacao'] = comparar_resultados(relatorio, json.load(f), args.tolerancia)
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(texto)
+    else:
+        print(texto)
+    if any(c['regressao'] for c in relatorio.get('comparacao', [])):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
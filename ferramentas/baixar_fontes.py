@@ -0,0 +1,43 @@
+import json
+import os
+from urllib.request import urlopen
+from modules.styles import DIRETORIO_FONTES, fontes_ausentes
+
+# ==================== DOWNLOAD DAS FONTES (MANUTENÇÃO) ====================
+# Ferramenta do mantenedor, não usada pelo app: baixa Sora e IBM Plex Sans
+# (pacotes Fontsource, SIL OFL 1.1) e as licenças para static/fonts, numa
+# máquina com internet. Os arquivos baixados são commitados no repositório;
+# os servidores só os leem do disco.
+# Uso: python -m ferramentas.baixar_fontes
+
+# Origem de cada arquivo no npm (via jsDelivr)
+URL_NPM = 'https://cdn.jsdelivr.net/npm'
+ORIGEM_FONTES = {
+    'sora-variable.woff2': '@fontsource-variable/sora@5/files/sora-latin-wght-normal.woff2',
+    'ibm-plex-sans-300.woff2': '@fontsource/ibm-plex-sans@5/files/ibm-plex-sans-latin-300-normal.woff2',
+    'ibm-plex-sans-400.woff2': '@fontsource/ibm-plex-sans@5/files/ibm-plex-sans-latin-400-normal.woff2',
+    'ibm-plex-sans-500.woff2': '@fontsource/ibm-plex-sans@5/files/ibm-plex-sans-latin-500-normal.woff2',
+    'ibm-plex-sans-600.woff2': '@fontsource/ibm-plex-sans@5/files/ibm-plex-sans-latin-600-normal.woff2',
+    'ibm-plex-sans-700.woff2': '@fontsource/ibm-plex-sans@5/files/ibm-plex-sans-latin-700-normal.woff2',
+    'OFL-sora.txt': '@fontsource-variable/sora@5/LICENSE',
+    'OFL-ibm-plex-sans.txt': '@fontsource/ibm-plex-sans@5/LICENSE',
+}
+
+def baixar_fontes(destino=DIRETORIO_FONTES):
+    """Baixa os arquivos de ORIGEM_FONTES que faltam em `destino`; devolve os baixados"""
+    os.makedirs(destino, exist_ok=True)
+    baixados = []
+    for arquivo, origem in ORIGEM_FONTES.items():
+        alvo = os.path.join(destino, arquivo)
+        if os.path.exists(alvo):
+            continue
+        with urlopen(f'{URL_NPM}/{origem}', timeout=30) as resposta:
+            dados = resposta.read()
+        with open(alvo + '.tmp', 'wb') as f:
+            f.write(dados)
+        os.replace(alvo + '.tmp', alvo)
+        baixados.append(arquivo)
+    return baixados
+
+if __name__ == '__main__':
+    print(json.dumps({'baixados': baixar_fontes(), 'ausentes': fontes_ausentes()}, indent=2))
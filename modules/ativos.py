@@ -0,0 +1,93 @@
+import base64
+import hashlib
+import os
+import streamlit as st
+
+# ==================== ATIVOS ESTÁTICOS ====================
+# Imagens são lidas, otimizadas e gravadas em static/ uma vez por processo
+# (e reaproveitadas entre processos pelo hash do conteúdo de origem). As
+# páginas referenciam o arquivo pela URL de static serving do Streamlit em
+# vez de embutir o base64 no HTML a cada execução.
+
+DIRETORIO_STATIC = 'static'
+DIRETORIO_ATIVOS = os.path.join(DIRETORIO_STATIC, 'ativos')
+URL_STATIC = 'app/static'
+
+MIME_POR_EXTENSAO = {
+    '.gif': 'image/gif',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.webp': 'image/webp',
+    '.svg': 'image/svg+xml',
+}
+
+def _otimizar_gif(origem, destino):
+    """Converte GIF (animado ou não) em WebP sem perdas; devolve False se não compensar"""
+    try:
+        from PIL import Image, ImageSequence, features
+    except ImportError:
+        return False
+    if not features.check('webp_anim'):
+        return False
+
+    with Image.open(origem) as imagem:
+        quadros = [quadro.convert('RGBA') for quadro in ImageSequence.Iterator(imagem)]
+        duracoes = [quadro.info.get('duration', 100) for quadro in ImageSequence.Iterator(imagem)]
+        loop = imagem.info.get('loop', 0)
+
+    temporario = destino + '.tmp'
+    quadros[0].save(temporario, 'WEBP', save_all=True, append_images=quadros[1:],
+                    duration=duracoes, loop=loop, lossless=True, method=4)
+    if os.path.getsize(temporario) >= os.path.getsize(origem):
+        os.remove(temporario)
+        return False
+    os.replace(temporario, destino)
+    return True
+
+@st.cache_resource(show_spinner=False)
+def preparar_ativo(origem):
+    """Publica um arquivo em static/ativos (otimizado quando possível) - uma vez por processo
+
+    Retorna dict com caminho, url, mime e bytes do arquivo servido, ou None se a origem não existir.
+    """
+    if not os.path.exists(origem):
+        return None
+
+    with open(origem, 'rb') as f:
+        conteudo = f.read()
+    nome, extensao = os.path.splitext(os.path.basename(origem))
+    prefixo = f"{nome}-{hashlib.sha256(conteudo).hexdigest()[:12]}"
+    os.makedirs(DIRETORIO_ATIVOS, exist_ok=True)
+
+    # GIF vira WebP sem perdas quando fica menor; os demais são copiados como estão
+    arquivo = prefixo + '.webp'
+    caminho = os.path.join(DIRETORIO_ATIVOS, arquivo)
+    otimizado = os.path.exists(caminho) or (extensao.lower() == '.gif' and _otimizar_gif(origem, caminho))
+    if not otimizado:
+        arquivo = prefixo + extensao.lower()
+        caminho = os.path.join(DIRETORIO_ATIVOS, arquivo)
+        if not os.path.exists(caminho):
+            with open(caminho, 'wb') as f:
+                f.write(conteudo)
+
+    return {
+        'caminho': caminho,
+        'url': f"{URL_STATIC}/ativos/{arquivo}",
+        'mime': MIME_POR_EXTENSAO.get(os.path.splitext(arquivo)[1], 'application/octet-stream'),
+        'bytes': os.path.getsize(caminho),
+    }
+
+@st.cache_resource(show_spinner=False)
+def _data_uri(caminho, mime):
+    with open(caminho, 'rb') as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+
+def url_ativo(origem):
+    """URL para usar em <img src>: static serving quando habilitado, senão data URI em cache"""
+    ativo = preparar_ativo(origem)
+    if ativo is None:
+        return None
+    if st.get_option('server.enableStaticServing'):
+        return ativo['url']
+    return _data_uri(ativo['caminho'], ativo['mime'])
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+# ==================== CACHE COLUNAR EM DISCO ====================
+# Guarda o DataFrame já limpo de cada planilha em .cache/, indexado por
+# tamanho, mtime e hash do conteúdo do arquivo de origem. Sobrevive a
+# reinícios do servidor e só é reconstruído quando a planilha muda de fato.
+
+DIRETORIO_CACHE = '.cache'
+
+# Incrementar sempre que a limpeza dos dados mudar, para invalidar caches antigos
+VERSAO_CACHE = 3
+
+def assinatura_arquivo(caminho):
+    """Retorna (tamanho, mtime em ns) do arquivo - verificação barata"""
+    info = os.stat(caminho)
+    return info.st_size, info.st_mtime_ns
+
+def hash_arquivo(caminho, bloco=1 << 20):
+    """Calcula o SHA-256 do conteúdo do arquivo"""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for pedaco in iter(lambda: f.read(bloco), b''):
+            sha.update(pedaco)
+    return sha.hexdigest()
+
+def versao_dados(df):
+    """Identificador da versão de um DataFrame (hash da planilha ou do conteúdo)"""
+    versao = df.attrs.get('versao')
+    if versao is None:
+        versao = format(int(pd.util.hash_pandas_object(df, index=True).sum()) & (2**64 - 1), 'x')
+    return versao
+
+def _caminhos_cache(nome):
+    base = os.path.join(DIRETORIO_CACHE, nome)
+    return base + '.json', base + '.parquet', base + '.pkl'
+
+def ler_manifesto(caminho_manifesto):
+    """Lê o manifesto JSON (None se ausente ou corrompido)"""
+    try:
+        with open(caminho_manifesto, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def gravar_manifesto(caminho_manifesto, manifesto):
+    """Grava o manifesto de forma atômica (arquivo temporário + rename)"""
+    temporario = caminho_manifesto + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f)
+    os.replace(temporario, caminho_manifesto)
+
+def ler_dados(manifesto, caminho_parquet, caminho_pickle):
+    """Lê um DataFrame gravado por `gravar_dados` (formato indicado no manifesto)"""
+    if manifesto.get('formato') == 'parquet':
+        return pd.read_parquet(caminho_parquet)
+    return pd.read_pickle(caminho_pickle)
+
+def gravar_dados(df, caminho_parquet, caminho_pickle):
+    """Grava em Parquet; cai para pickle se alguma coluna não for serializável em Arrow"""
+    try:
+        df.to_parquet(caminho_parquet + '.tmp')
+        os.replace(caminho_parquet + '.tmp', caminho_parquet)
+        return 'parquet'
+    except (ImportError, ValueError, TypeError):
+        if os.path.exists(caminho_parquet + '.tmp'):
+            os.remove(caminho_parquet + '.tmp')
+        df.to_pickle(caminho_pickle + '.tmp')
+        os.replace(caminho_pickle + '.tmp', caminho_pickle)
+        return 'pickle'
+
+def carregar_com_cache(caminho, processar, nome=None):
+    """Carrega `caminho` via `processar(caminho)`, reaproveitando o cache em disco
+
+    O DataFrame retornado leva o hash da planilha em `df.attrs['versao']`.
+    """
+    nome = nome or os.path.splitext(os.path.basename(caminho))[0]
+    caminho_manifesto, caminho_parquet, caminho_pickle = _caminhos_cache(nome)
+    tamanho, mtime = assinatura_arquivo(caminho)
+    manifesto = ler_manifesto(caminho_manifesto)
+
+    if manifesto and manifesto.get('versao_cache') == VERSAO_CACHE:
+        mesmo_arquivo = manifesto.get('tamanho') == tamanho and manifesto.get('mtime_ns') == mtime
+        conteudo = manifesto['sha256'] if mesmo_arquivo else hash_arquivo(caminho)
+        if conteudo == manifesto.get('sha256'):
+            try:
+                df = ler_dados(manifesto, caminho_parquet, caminho_pickle)
+            except Exception:
+                df = None
+            if df is not None:
+                if not mesmo_arquivo:
+                    # Arquivo só foi "tocado": atualiza a assinatura barata
+                    manifesto.update(tamanho=tamanho, mtime_ns=mtime)
+                    gravar_manifesto(caminho_manifesto, manifesto)
+                df.attrs['versao'] = conteudo
+                return df
+    else:
+        conteudo = hash_arquivo(caminho)
+
+    df = processar(caminho)
+
+    try:
+        os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+        formato = gravar_dados(df, caminho_parquet, caminho_pickle)
+        gravar_manifesto(caminho_manifesto, {
+            'arquivo': os.path.abspath(caminho),
+            'tamanho': tamanho,
+            'mtime_ns': mtime,
+            'sha256': conteudo,
+            'versao_cache': VERSAO_CACHE,
+            'formato': formato,
+        })
+    except OSError:
+        # Sem permissão de escrita: segue sem cache persistente
+        pass
+
+    df.attrs['versao'] = conteudo
+    return df
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from modules.periodos import calendario_periodos
+from modules.motor_previsao import base_ultimo_periodo, construir_indice_clientes
+from modules.utils import calcular_valor_proporcional_serie
+
+# ==================== MOTOR DE CENÁRIOS ====================
+# Vários cenários de previsão calculados de uma vez, num array
+# clientes x meses x cenários. Cada cenário ajusta a previsão padrão
+# (último mês repetido + MRR das ativações) com:
+# - Crescimento: % ao mês, composto, sobre a receita atual dos clientes
+# - Churn: % ao mês da receita atual perdida, composto
+# - Atraso: meses somados à data prevista de todas as ativações
+# O cenário neutro (0, 0, 0) reproduz `gerar_previsao_com_ativacoes`.
+
+COLUNAS_CENARIOS = ['Cenário', 'Crescimento', 'Atraso', 'Churn']
+
+def normalizar_cenarios(cenarios):
+    """Tabela de cenários validada: sem linhas sem nome, valores ausentes como 0
+
+    Levanta ValueError com nomes repetidos, crescimento de -100% ou menos, ou churn fora de 0-100%.
+    """
+    tabela = pd.DataFrame(cenarios, columns=COLUNAS_CENARIOS)
+    tabela['Cenário'] = tabela['Cenário'].astype(object).where(tabela['Cenário'].notna(), '')
+    tabela['Cenário'] = tabela['Cenário'].astype(str).str.strip()
+    tabela = tabela[tabela['Cenário'] != ''].reset_index(drop=True)
+    tabela['Crescimento'] = pd.to_numeric(tabela['Crescimento'], errors='coerce').fillna(0.0).astype(float)
+    tabela['Churn'] = pd.to_numeric(tabela['Churn'], errors='coerce').fillna(0.0).astype(float)
+    tabela['Atraso'] = pd.to_numeric(tabela['Atraso'], errors='coerce').fillna(0).clip(lower=0).astype(int)
+
+    repetidos = tabela.loc[tabela['Cenário'].duplicated(), 'Cenário'].unique()
+    if len(repetidos):
+        raise ValueError(f"Cenários repetidos: {', '.join(repetidos)}")
+    if (tabela['Crescimento'] <= -100).any():
+        raise ValueError("Crescimento deve ser maior que -100% ao mês")
+    if ((tabela['Churn'] < 0) | (tabela['Churn'] > 100)).any():
+        raise ValueError("Churn deve ficar entre 0% e 100% ao mês")
+    return tabela
+
+def deslocar_meses(datas, meses):
+    """Datas (datetime64[D]) somadas de `meses` meses, com o dia limitado ao fim do mês (broadcast)"""
+    mes = datas.astype('datetime64[M]')
+    dia = (datas - mes.astype('datetime64[D]')).astype(np.int64)
+    destino = mes + np.asarray(meses).astype('timedelta64[M]')
+    dias_no_mes = ((destino + 1).astype('datetime64[D]') - destino.astype('datetime64[D]')).astype(np.int64)
+    return destino.astype('datetime64[D]') + np.minimum(dia, dias_no_mes - 1).astype('timedelta64[D]')
+
+def clientes_das_ativacoes(ativ, df_ultimo, base_clientes):
+    """Linha de cada ativação no eixo de clientes e os nomes dos clientes novos
+
+    Clientes da base vêm primeiro (ordem de `base_clientes`); os novos seguem,
+    um por chave normalizada, com o nome da primeira ativação na planilha.
+    """
+    indice_base = construir_indice_clientes(df_ultimo)
+    nomes = ativ['CLIENTE_KEY'].map(indice_base)
+    linhas = base_clientes.index.get_indexer(nomes.where(nomes.notna(), None))
+
+    novos = nomes.isna().to_numpy()
+    chaves_novas = ativ.loc[novos, 'CLIENTE_KEY']
+    codigos, chaves = pd.factorize(chaves_novas, sort=False)
+    linhas[novos] = len(base_clientes) + codigos
+    primeiros = ativ.loc[novos, 'CLIENTE'].groupby(codigos, sort=True).first()
+    return linhas, primeiros.to_numpy(dtype=object)
+
+def simular_cenarios(df, df_ativacoes, cenarios, meses_futuros):
+    """Previsão de todos os cenários numa passada vetorizada
+
+    Retorna (clientes, calendario, valores): nomes dos clientes, calendário dos
+    meses previstos (`calendario_periodos`) e o array clientes x meses x cenários
+    na ordem de `normalizar_cenarios(cenarios)`.
+    """
+    cenarios = normalizar_cenarios(cenarios)
+    ultimo_ordinal, df_ultimo = base_ultimo_periodo(df)
+    base_clientes = df_ultimo.groupby('GRUPO CLIENTE', observed=True)['Vlr Valido'].sum()
+    calendario = calendario_periodos(ultimo_ordinal + 1, ultimo_ordinal + meses_futuros)
+    ordinais = calendario['PERIODO_ORD'].to_numpy()
+
+    # Receita atual: fator composto (1 + crescimento) x (1 - churn) por mês e cenário
+    taxa = (1 + cenarios['Crescimento'].to_numpy() / 100) * (1 - cenarios['Churn'].to_numpy() / 100)
+    fatores = taxa[None, :] ** np.arange(1, meses_futuros + 1)[:, None]
+    valores_base = base_clientes.to_numpy(dtype=float)[:, None, None] * fatores[None, :, :]
+
+    clientes = base_clientes.index.to_numpy(dtype=object)
+    if df_ativacoes.empty or meses_futuros <= 0:
+        return clientes, calendario, valores_base
+
+    ativ = df_ativacoes[df_ativacoes['DATA_PREVISTA'].notna()].reset_index(drop=True)
+    linhas, nomes_novos = clientes_das_ativacoes(ativ, df_ultimo, base_clientes)
+    mrr = ativ['VALOR_MRR'].to_numpy(dtype=float)
+
+    # Datas de entrada por cenário x ativação, já com o atraso do cenário
+    datas = ativ['DATA_PREVISTA'].to_numpy().astype('datetime64[D]')
+    entradas = deslocar_meses(datas[None, :], cenarios['Atraso'].to_numpy()[:, None])
+    ordinal_entrada = entradas.astype('datetime64[M]').astype(np.int64) + 1970 * 12
+    proporcional = calcular_valor_proporcional_serie(entradas.ravel(), np.tile(mrr, len(cenarios)))
+    proporcional = proporcional.reshape(entradas.shape)
+
+    # Contribuição ativação x mês x cenário: proporcional na entrada, cheio depois
+    mes = ordinais[None, :, None]
+    entrada = ordinal_entrada.T[:, None, :]
+    contribuicao = np.where(mes == entrada, proporcional.T[:, None, :],
+                            np.where(mes > entrada, mrr[:, None, None], 0.0))
+
+    valores = np.zeros((len(clientes) + len(nomes_novos), meses_futuros, len(cenarios)))
+    valores[:len(clientes)] = valores_base
+    np.add.at(valores, linhas, contribuicao)
+    return np.concatenate([clientes, nomes_novos]), calendario, valores
+
+def totais_cenarios(df, df_ativacoes, cenarios, meses_futuros):
+    """Faturamento previsto total por cenário e mês (formato longo)
+
+    Colunas: Cenário, PERIODO_ORD, Periodo, MÊS, ANO, Valor.
+    """
+    cenarios = normalizar_cenarios(cenarios)
+    if df.empty or cenarios.empty:
+        return pd.DataFrame(columns=['Cenário', 'PERIODO_ORD', 'Periodo', 'MÊS', 'ANO', 'Valor'])
+    _, calendario, valores = simular_cenarios(df, df_ativacoes, cenarios, meses_futuros)
+    # Como na previsão padrão, células cliente x mês sem valor positivo ficam de fora
+    totais = np.where(valores > 0, valores, 0.0).sum(axis=0)
+    quantidade = len(cenarios)
+    return pd.DataFrame({
+        'Cenário': np.tile(cenarios['Cenário'].to_numpy(dtype=object), meses_futuros),
+        'PERIODO_ORD': np.repeat(calendario['PERIODO_ORD'].to_numpy(), quantidade),
+        'Periodo': np.repeat(calendario['Periodo'].to_numpy(dtype=object), quantidade),
+        'MÊS': np.repeat(calendario['MÊS'].to_numpy(), quantidade),
+        'ANO': np.repeat(calendario['ANO'].to_numpy(), quantidade),
+        'Valor': totais.ravel(),
+    })
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import sys
+import time
+import pandas as pd
+from modules import nucleo
+from modules.config import ARQUIVO_FATURAMENTO, ARQUIVO_ATIVACOES, DIRETORIO_FATURAMENTO, HORIZONTE_PREVISAO_MESES
+from modules.cubo import consultar_cubo
+from modules.ingestao import ULTIMA_COMPACTACAO
+
+# ==================== CLI DE PROCESSAMENTO EM LOTE ====================
+# Calcula agregados e previsão fora do dashboard (cron, pipelines) e grava
+# em Parquet ou CSV:
+#   python -m modules.cli --saida saida --formato parquet --meses 12
+
+FORMATOS = ('parquet', 'csv')
+
+def gravar_tabela(df, caminho_base, formato='parquet'):
+    """Grava `df` em `caminho_base.<formato>` e devolve o caminho"""
+    caminho = f'{caminho_base}.{formato}'
+    if formato == 'parquet':
+        df.to_parquet(caminho, index=False)
+    elif formato == 'csv':
+        df.to_csv(caminho, index=False, encoding='utf-8-sig')
+    else:
+        raise ValueError(f"Formato desconhecido: {formato} (use {' ou '.join(FORMATOS)})")
+    return caminho
+
+def calcular_tabelas(df, df_ativacoes, meses_futuros=HORIZONTE_PREVISAO_MESES):
+    """Agregados do cubo e previsão, por nome de tabela"""
+    cubo = nucleo.obter_cubo(df)
+    return {
+        'cubo': cubo,
+        'faturamento_mensal': consultar_cubo(cubo, ['PERIODO_ORD', 'Periodo', 'MÊS', 'ANO']),
+        'faturamento_servicos': consultar_cubo(cubo, ['PERIODO_ORD', 'Periodo', 'tpServ']),
+        'faturamento_clientes': consultar_cubo(cubo, ['GRUPO CLIENTE']),
+        'previsao': nucleo.obter_previsao(df, df_ativacoes, meses_futuros),
+    }
+
+def exportar(saida, formato='parquet', meses_futuros=HORIZONTE_PREVISAO_MESES,
+             caminho_faturamento=ARQUIVO_FATURAMENTO, diretorio_faturamento=DIRETORIO_FATURAMENTO,
+             caminho_ativacoes=ARQUIVO_ATIVACOES):
+    """Carrega as bases, calcula as tabelas e grava cada uma em `saida`; devolve um resumo"""
+    inicio = time.perf_counter()
+    df = nucleo.carregar_faturamento(caminho_faturamento, diretorio_faturamento)
+    try:
+        df_ativacoes = nucleo.carregar_ativacoes(caminho_ativacoes)
+    except Exception as e:
+        # Como no dashboard: sem ativações, a previsão repete o último mês
+        print(f"Aviso: não foi possível carregar {caminho_ativacoes}: {e}", file=sys.stderr)
+        df_ativacoes = pd.DataFrame()
+
+    tabelas = calcular_tabelas(df, df_ativacoes, meses_futuros)
+    os.makedirs(saida, exist_ok=True)
+    arquivos = {nome: {'caminho': gravar_tabela(tabela, os.path.join(saida, nome), formato),
+                       'linhas': len(tabela)}
+                for nome, tabela in tabelas.items()}
+    return {
+        'linhas_faturamento': len(df),
+        'linhas_ativacoes': len(df_ativacoes),
+        'memoria_faturamento_mb': {'antes': ULTIMA_COMPACTACAO.get('antes_mb'),
+                                   'depois': ULTIMA_COMPACTACAO.get('depois_mb')},
+        'memoria_faturamento_bytes': {'antes': ULTIMA_COMPACTACAO.get('antes_bytes'),
+                                      'depois': ULTIMA_COMPACTACAO.get('depois_bytes')},
+        'meses_previsao': meses_futuros,
+        'arquivos': arquivos,
+        'segundos': round(time.perf_counter() - inicio, 4),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m modules.cli',
+        description='Calcula agregados e previsão de faturamento e grava em Parquet/CSV.')
+    parser.add_argument('--saida', default='saida', help='diretório de saída (padrão: saida)')
+    parser.add_argument('--formato', choices=FORMATOS, default='parquet')
+    parser.add_argument('--meses', type=int, default=HORIZONTE_PREVISAO_MESES, help='meses de previsão')
+    parser.add_argument('--faturamento', default=ARQUIVO_FATURAMENTO, help='planilha de faturamento')
+    parser.add_argument('--diretorio-faturamento', default=DIRETORIO_FATURAMENTO,
+                        help='diretório com várias planilhas de faturamento (tem prioridade se existir)')
+    parser.add_argument('--ativacoes', default=ARQUIVO_ATIVACOES, help='planilha de ativações em andamento')
+    args = parser.parse_args(argv)
+
+    resumo = exportar(args.saida, args.formato, args.meses, args.faturamento,
+                      args.diretorio_faturamento, args.ativacoes)
+    print(json.dumps(resumo, indent=2, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-import streamlit as st
+import os
 
 # ==================== ÍCONES SVG PROFISSIONAIS ====================
 ICONS = {
@@ -56,3 +56,46 @@ CORES_SERVICOS = {
     'CCENTER': COLORS['ccenter'],
     'OUT': COLORS['out']
 }
+
+# ==================== PREVISÃO ====================
+# Horizonte calculado uma única vez por versão dos dados; os sliders das
+# páginas apenas fatiam esse resultado.
+HORIZONTE_PREVISAO_MESES = 12
+
+# ==================== CENÁRIOS ====================
+# Cenários iniciais da comparação no Consolidado (editáveis na página).
+# Crescimento e churn em % ao mês sobre a receita atual; atraso em meses
+# aplicado à data prevista de todas as ativações.
+CENARIOS_PADRAO = [
+    {'Cenário': 'Pessimista', 'Crescimento': -1.0, 'Atraso': 2, 'Churn': 1.0},
+    {'Cenário': 'Base', 'Crescimento': 0.0, 'Atraso': 0, 'Churn': 0.0},
+    {'Cenário': 'Otimista', 'Crescimento': 1.5, 'Atraso': 0, 'Churn': 0.0},
+]
+
+# ==================== RISCO DAS ATIVAÇÕES (MONTE CARLO) ====================
+# Por STATUS da planilha EM-ATIVACAO: probabilidade de a ativação acontecer e
+# atraso médio (meses, distribuição de Poisson) sobre a DATA PREVISTA.
+# Status fora da tabela usam RISCO_STATUS_PADRAO.
+RISCO_POR_STATUS = {
+    'EM ANDAMENTO': {'probabilidade': 0.90, 'atraso_medio': 0.5},
+    'AGUARDANDO CLIENTE': {'probabilidade': 0.75, 'atraso_medio': 1.5},
+    'PAUSADO': {'probabilidade': 0.50, 'atraso_medio': 3.0},
+}
+RISCO_STATUS_PADRAO = {'probabilidade': 0.80, 'atraso_medio': 1.0}
+SIMULACOES_MONTE_CARLO = 20_000
+# Processos para os lotes de simulações (1: no próprio processo)
+PROCESSOS_MONTE_CARLO = 1
+
+# ==================== FONTES DE DADOS ====================
+ARQUIVO_FATURAMENTO = 'BD-FATURAMENTO.xlsx'
+ARQUIVO_ATIVACOES = 'EM-ATIVACAO.xlsx'
+
+# Se o diretório existir, a base de faturamento é a concatenação de todas as
+# planilhas (arquivos x abas) dele, lidas em paralelo; senão, BD-FATURAMENTO.xlsx.
+DIRETORIO_FATURAMENTO = 'faturamento'
+PADRAO_PLANILHAS_FATURAMENTO = '*.xlsx'
+
+# ==================== DEPURAÇÃO ====================
+# Uma linha JSON por etapa medida (logger `telco.tempos`, no stderr). Desligado
+# por padrão; liga com TELCO_LOG_TEMPOS_JSON=1 no ambiente.
+LOG_TEMPOS_JSON = os.environ.get('TELCO_LOG_TEMPOS_JSON', '').lower() in ('1', 'true', 'sim')
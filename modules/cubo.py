@@ -0,0 +1,41 @@
+import pandas as pd
+
+# ==================== CUBO DE AGREGAÇÃO ====================
+# Base de faturamento pré-agregada em GRUPO CLIENTE x Periodo x tpServ.
+# PERIODO_ORD, MÊS e ANO acompanham o Periodo para ordenação cronológica.
+# As views consultam o cubo em vez de reagrupar a base linha a linha.
+
+DIMENSOES_CUBO = ['GRUPO CLIENTE', 'PERIODO_ORD', 'Periodo', 'MÊS', 'ANO', 'tpServ']
+
+def construir_cubo(df):
+    """Agrega a base em cliente x período x serviço -> soma e quantidade de linhas"""
+    if df.empty:
+        return pd.DataFrame(columns=DIMENSOES_CUBO + ['Vlr Valido', 'Linhas'])
+    return (df.groupby(DIMENSOES_CUBO, dropna=False, observed=True)['Vlr Valido']
+              .agg(**{'Vlr Valido': 'sum', 'Linhas': 'size'})
+              .reset_index())
+
+def fatiar_cubo(cubo, filtros=None):
+    """Filtra o cubo por valor (ou lista de valores) em cada dimensão"""
+    if not filtros:
+        return cubo
+    mascara = pd.Series(True, index=cubo.index)
+    for dimensao, valor in filtros.items():
+        if isinstance(valor, (list, tuple, set, pd.Index, pd.Series)):
+            mascara &= cubo[dimensao].isin(valor)
+        else:
+            mascara &= cubo[dimensao] == valor
+    return cubo[mascara]
+
+def consultar_cubo(cubo, dimensoes, filtros=None, medida='Vlr Valido'):
+    """Roll-up do cubo nas dimensões pedidas (mesmo formato de um groupby().sum().reset_index())"""
+    fatia = fatiar_cubo(cubo, filtros)
+    return fatia.groupby(list(dimensoes), observed=True)[medida].sum().reset_index()
+
+def total_cubo(cubo, filtros=None, medida='Vlr Valido'):
+    """Soma total da medida na fatia"""
+    return fatiar_cubo(cubo, filtros)[medida].sum()
+
+def distintos_cubo(cubo, dimensao, filtros=None):
+    """Quantidade de valores distintos de uma dimensão na fatia"""
+    return fatiar_cubo(cubo, filtros)[dimensao].nunique()
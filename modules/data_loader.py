@@ -1,95 +1,87 @@
 import streamlit as st
 import pandas as pd
-from modules.utils import normalizar_nome_cliente, calcular_valor_proporcional
+from modules import nucleo
+from modules.cache_disco import versao_dados
+from modules.instrumentacao import medir_etapa
 
-@st.cache_data
+# ==================== ADAPTADOR STREAMLIT ====================
+# Camada fina sobre modules/nucleo.py: cache do Streamlit por versão dos
+# dados e mensagens de erro na interface. Toda a lógica fica no núcleo.
+
+@medir_etapa('load_data')
+@st.cache_resource(show_spinner=False)
 def load_data():
-    """Carrega e processa a base de dados"""
+    """Carrega e processa a base de dados (só as partições novas ou alteradas são reprocessadas)
+
+    Com o diretório `DIRETORIO_FATURAMENTO`, lê todas as planilhas dele em paralelo.
+    Uma única instância somente leitura por processo, compartilhada por todas as
+    sessões sem cópia (o st.cache_data devolveria uma cópia por chamada).
+    """
     try:
-        df = pd.read_excel('BD-FATURAMENTO.xlsx')
-        
-        df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
-        df['Vlr Valido'] = pd.to_numeric(df['Vlr Valido'], errors='coerce')
-        df['MÊS'] = pd.to_numeric(df['MÊS'], errors='coerce')
-        df['ANO'] = pd.to_numeric(df['ANO'], errors='coerce')
-        df['Periodo'] = df['Descrição'].astype(str) + '/' + df['ANO'].astype(str)
-        
-        return df
+        return nucleo.congelar(nucleo.carregar_faturamento())
     except Exception as e:
         st.error(f"Erro ao carregar base de dados: {e}")
         return pd.DataFrame()
 
+@medir_etapa('carregar_ativacoes')
 @st.cache_data(ttl=600)
 def carregar_ativacoes():
     """Carrega a planilha de ativações em andamento"""
     try:
-        df = pd.read_excel('EM-ATIVACAO.xlsx', sheet_name='EM ATIVAÇÃO')
-        df['CLIENTE_NORM'] = df['CLIENTE'].apply(normalizar_nome_cliente)
-        df['DATA_PREVISTA'] = pd.to_datetime(df['DATA PREVISTA'], errors='coerce')
-        df['VALOR_MRR'] = pd.to_numeric(df['VALOR TOTAL'], errors='coerce')
-        return df[['CLIENTE', 'CLIENTE_NORM', 'DATA_PREVISTA', 'VALOR_MRR', 'PRODUTO', 'STATUS']].dropna(subset=['DATA_PREVISTA', 'VALOR_MRR'])
+        return nucleo.carregar_ativacoes()
     except Exception as e:
         st.warning(f"Não foi possível carregar EM-ATIVACAO.xlsx: {e}")
         return pd.DataFrame()
 
-def gerar_previsao_com_ativacoes(df, df_ativacoes, meses_futuros=6):
-    """Gera previsão baseada em ativações reais"""
-    if df.empty:
-        return pd.DataFrame()
-    
-    ultimo_mes = df['MÊS'].max()
-    ultimo_ano = df['ANO'].max()
-    df_ultimo = df[(df['MÊS'] == ultimo_mes) & (df['ANO'] == ultimo_ano)]
-    base_clientes = df_ultimo.groupby('GRUPO CLIENTE')['Vlr Valido'].sum().to_dict()
-    
-    previsoes = []
-    mes_atual = ultimo_mes
-    ano_atual = ultimo_ano
-    
-    meses_nome = ['', 'JANEIRO', 'FEVEREIRO', 'MARÇO', 'ABRIL', 'MAIO', 'JUNHO',
-                  'JULHO', 'AGOSTO', 'SETEMBRO', 'OUTUBRO', 'NOVEMBRO', 'DEZEMBRO']
-    
-    for i in range(1, meses_futuros + 1):
-        mes_atual += 1
-        if mes_atual > 12:
-            mes_atual = 1
-            ano_atual += 1
-        
-        periodo_nome = f"{meses_nome[mes_atual]}/{ano_atual}"
-        data_mes = pd.Timestamp(year=ano_atual, month=mes_atual, day=1)
-        previsao_mes = base_clientes.copy()
-        
-        if not df_ativacoes.empty:
-            for _, ativ in df_ativacoes.iterrows():
-                data_ativ = ativ['DATA_PREVISTA']
-                if pd.notna(data_ativ) and data_ativ < data_mes + pd.DateOffset(months=1):
-                    if data_ativ.year == ano_atual and data_ativ.month == mes_atual:
-                        valor = calcular_valor_proporcional(data_ativ, ativ['VALOR_MRR'])
-                    elif data_ativ < data_mes:
-                        valor = ativ['VALOR_MRR']
-                    else:
-                        continue
-                    
-                    cliente_key = None
-                    for k in previsao_mes.keys():
-                        if normalizar_nome_cliente(k) == ativ['CLIENTE_NORM']:
-                            cliente_key = k
-                            break
-                    
-                    if cliente_key:
-                        previsao_mes[cliente_key] += valor
-                    else:
-                        previsao_mes[ativ['CLIENTE']] = valor
-        
-        for cliente, valor in previsao_mes.items():
-            if valor > 0:
-                previsoes.append({
-                    'Cliente': cliente,
-                    'Periodo': periodo_nome,
-                    'MÊS': mes_atual,
-                    'ANO': ano_atual,
-                    'Valor': valor,
-                    'Tipo': 'Previsto'
-                })
-    
-    return pd.DataFrame(previsoes)
+@st.cache_data(show_spinner=False)
+def _cubo_por_versao(_df, versao):
+    return nucleo.calcular_cubo(_df)
+
+@medir_etapa('obter_cubo')
+def obter_cubo(df):
+    """Cubo de agregação da base, uma vez por versão (montado dos cubos das partições quando possível)"""
+    return _cubo_por_versao(df, versao_dados(df))
+
+@st.cache_data(show_spinner=False)
+def _previsao_por_versao(_df, _df_ativacoes, versao_base, versao_ativacoes, horizonte):
+    return nucleo.calcular_previsao(_df, _df_ativacoes, horizonte)
+
+@medir_etapa('obter_previsao')
+def obter_previsao(df, df_ativacoes, meses_futuros):
+    """Previsão dos próximos `meses_futuros` meses, fatiada da previsão em cache
+
+    A previsão é calculada uma vez no horizonte máximo por versão das duas bases.
+    """
+    horizonte = nucleo.horizonte_previsao(meses_futuros)
+    ultimo_ordinal, previsao = _previsao_por_versao(df, df_ativacoes, versao_dados(df),
+                                                    versao_dados(df_ativacoes), horizonte)
+    return nucleo.fatiar_previsao(ultimo_ordinal, previsao, meses_futuros)
+
+@st.cache_data(show_spinner="Simulando risco das ativações...")
+def _monte_carlo_por_versao(_df, _df_ativacoes, versao_base, versao_ativacoes, horizonte):
+    return nucleo.calcular_monte_carlo(_df, _df_ativacoes, horizonte)
+
+@medir_etapa('obter_monte_carlo')
+def obter_monte_carlo(df, df_ativacoes, meses_futuros):
+    """Faixas P10/P50/P90 da simulação de risco das ativações, fatiadas da simulação em cache
+
+    A simulação roda uma vez no horizonte máximo por versão das duas bases.
+    """
+    horizonte = nucleo.horizonte_previsao(meses_futuros)
+    ultimo_ordinal, faixas = _monte_carlo_por_versao(df, df_ativacoes, versao_dados(df),
+                                                     versao_dados(df_ativacoes), horizonte)
+    return nucleo.fatiar_previsao(ultimo_ordinal, faixas, meses_futuros)
+
+@st.cache_data(show_spinner=False)
+def _cenarios_por_versao(_df, _df_ativacoes, versao_base, versao_ativacoes, cenarios, meses_futuros):
+    return nucleo.totais_cenarios(_df, _df_ativacoes, cenarios, meses_futuros)
+
+@medir_etapa('obter_cenarios')
+def obter_cenarios(df, df_ativacoes, cenarios, meses_futuros):
+    """Faturamento previsto por cenário e mês, uma vez por versão das bases e tabela de cenários
+
+    Levanta ValueError para tabelas de cenários inválidas.
+    """
+    tabela = nucleo.normalizar_cenarios(cenarios)
+    return _cenarios_por_versao(df, df_ativacoes, versao_dados(df), versao_dados(df_ativacoes),
+                                tabela, meses_futuros)
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import sys
+import time
+import pandas as pd
+from modules.cache_disco import (DIRETORIO_CACHE, VERSAO_CACHE, ler_manifesto, gravar_manifesto,
+                                 ler_dados, gravar_dados)
+from modules.cubo import DIMENSOES_CUBO, construir_cubo
+from modules.ingestao import ler_colunas_faturamento, coagir_faturamento, derivar_faturamento
+
+# ==================== BASE INCREMENTAL POR PARTIÇÃO ====================
+# A base de faturamento fica em .cache/faturamento_particoes, uma partição por
+# (ANO, MÊS), cada uma com seu pedaço do cubo. Ao mudar a planilha, as linhas
+# são lidas (só as colunas usadas, com o leitor calamine quando instalado),
+# agrupadas por partição e comparadas pelo hash; só as partições novas ou
+# alteradas passam por conversão de tipos, colunas derivadas e agregação.
+# As demais vêm prontas do disco. O hash cobre só o conteúdo das linhas: a
+# posição de cada linha na planilha vem da leitura atual, então inserir ou
+# remover linhas não reprocessa as partições seguintes.
+
+DIRETORIO_PARTICOES = os.path.join(DIRETORIO_CACHE, 'faturamento_particoes')
+PARTICAO_SEM_PERIODO = 'sem-periodo'
+
+# Relatório da última atualização feita neste processo
+ULTIMA_ATUALIZACAO = {}
+
+def _caminhos_particao(chave):
+    base = os.path.join(DIRETORIO_PARTICOES, chave)
+    return {
+        'dados': (base + '.parquet', base + '.pkl'),
+        'cubo': (base + '.cubo.parquet', base + '.cubo.pkl'),
+    }
+
+def _chaves_particao(brutas):
+    """Chave 'AAAA-MM' de cada linha (a partir dos valores brutos de ANO e MÊS)"""
+    anos = pd.to_numeric(brutas['ANO'], errors='coerce')
+    meses = pd.to_numeric(brutas['MÊS'], errors='coerce')
+    validas = anos.notna() & meses.notna()
+    chaves = pd.Series(PARTICAO_SEM_PERIODO, index=brutas.index, dtype=object)
+    chaves[validas] = (anos[validas].astype(int).map('{:04d}'.format) + '-'
+                       + meses[validas].astype(int).map('{:02d}'.format))
+    return chaves
+
+def _hash_particao(hashes_linhas):
+    """Hash do conteúdo bruto das linhas de uma partição, na ordem em que aparecem"""
+    return hashlib.sha256(hashes_linhas.tobytes()).hexdigest()
+
+def _digest_particoes(particoes, chaves):
+    """Identificador do conjunto de partições (muda se qualquer uma mudar ou se as linhas mudarem de lugar)"""
+    sha = hashlib.sha256()
+    for chave in sorted(particoes):
+        sha.update(f"{chave}:{particoes[chave]['hash']};".encode())
+    sha.update(pd.util.hash_pandas_object(chaves, index=False).to_numpy().tobytes())
+    return sha.hexdigest()
+
+def _ingerir_particao(brutas):
+    """Converte tipos, deriva colunas e agrega uma partição"""
+    dados = derivar_faturamento(coagir_faturamento(brutas.reset_index(drop=True)))
+    return dados, construir_cubo(dados)
+
+def _gravar_particao(chave, dados, cubo):
+    caminhos = _caminhos_particao(chave)
+    formato = gravar_dados(dados, *caminhos['dados'])
+    formato_cubo = gravar_dados(cubo, *caminhos['cubo'])
+    return formato, formato_cubo
+
+def _remover_particao(chave):
+    for caminho in sum(_caminhos_particao(chave).values(), ()):
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+def processar_faturamento_incremental(caminho, colunas=None, aba=0):
+    """Lê a planilha e reprocessa só as partições (ANO, MÊS) novas ou alteradas
+
+    Produz o mesmo DataFrame de `processar_faturamento` nas colunas usadas (mesma ordem de linhas),
+    com o identificador do conjunto de partições em `df.attrs['particoes']`.
+    """
+    inicio = time.perf_counter()
+    brutas = ler_colunas_faturamento(caminho, colunas, aba)
+    chaves = _chaves_particao(brutas)
+    hashes_linhas = pd.util.hash_pandas_object(brutas, index=False).to_numpy()
+
+    caminho_manifesto = os.path.join(DIRETORIO_PARTICOES, 'manifesto.json')
+    manifesto = ler_manifesto(caminho_manifesto) or {}
+    anteriores = manifesto.get('particoes', {}) if manifesto.get('versao_cache') == VERSAO_CACHE else {}
+
+    os.makedirs(DIRETORIO_PARTICOES, exist_ok=True)
+    particoes = {}
+    partes = []
+    relatorio = {'novas': [], 'alteradas': [], 'reaproveitadas': [], 'removidas': []}
+
+    for chave, posicoes in chaves.groupby(chaves, sort=True).indices.items():
+        hash_atual = _hash_particao(hashes_linhas[posicoes])
+        anterior = anteriores.get(chave)
+        dados = None
+
+        if anterior and anterior['hash'] == hash_atual:
+            try:
+                caminhos = _caminhos_particao(chave)
+                dados = ler_dados(anterior, *caminhos['dados'])
+                particoes[chave] = anterior
+                relatorio['reaproveitadas'].append(chave)
+            except Exception:
+                dados = None
+
+        if dados is None:
+            dados, cubo = _ingerir_particao(brutas.iloc[posicoes])
+            formato, formato_cubo = _gravar_particao(chave, dados, cubo)
+            particoes[chave] = {'hash': hash_atual, 'linhas': len(posicoes),
+                                'formato': formato, 'formato_cubo': formato_cubo}
+            relatorio['alteradas' if anterior else 'novas'].append(chave)
+
+        # Posições da leitura atual: valem também para partições reaproveitadas que mudaram de lugar
+        partes.append(dados.assign(_linha=posicoes))
+
+    for chave in set(anteriores) - set(particoes):
+        _remover_particao(chave)
+        relatorio['removidas'].append(chave)
+
+    digest = _digest_particoes(particoes, chaves)
+    gravar_manifesto(caminho_manifesto, {
+        'versao_cache': VERSAO_CACHE,
+        'digest': digest,
+        'particoes': particoes,
+    })
+
+    # Reconstrói a ordem original das linhas da planilha
+    if partes:
+        df = pd.concat(partes, ignore_index=True).sort_values('_linha', kind='stable')
+        df = df.drop(columns='_linha').reset_index(drop=True)
+    else:
+        df = derivar_faturamento(coagir_faturamento(brutas))
+
+    ULTIMA_ATUALIZACAO.clear()
+    ULTIMA_ATUALIZACAO.update(relatorio, linhas=len(df), particoes=len(particoes),
+                              segundos=round(time.perf_counter() - inicio, 4))
+    df.attrs['particoes'] = digest
+    return df
+
+def cubo_das_particoes(digest):
+    """Cubo completo montado com os cubos das partições, se o armazenamento bater com `digest`"""
+    if not digest:
+        return None
+    manifesto = ler_manifesto(os.path.join(DIRETORIO_PARTICOES, 'manifesto.json'))
+    if not manifesto or manifesto.get('digest') != digest or manifesto.get('versao_cache') != VERSAO_CACHE:
+        return None
+    try:
+        cubos = [ler_dados({'formato': info['formato_cubo']}, *_caminhos_particao(chave)['cubo'])
+                 for chave, info in manifesto['particoes'].items()]
+    except Exception:
+        return None
+    if not cubos:
+        return None
+    # Partições são disjuntas em PERIODO_ORD: concatenar e ordenar equivale ao groupby global
+    cubo = pd.concat(cubos, ignore_index=True)
+    return cubo.sort_values(DIMENSOES_CUBO, na_position='last', kind='stable').reset_index(drop=True)
+
+if __name__ == '__main__':
+    processar_faturamento_incremental(*(sys.argv[1:2] or ['BD-FATURAMENTO.xlsx']))
+    print(json.dumps(ULTIMA_ATUALIZACAO, indent=2, ensure_ascii=False))
@@ -0,0 +1,191 @@
+import json
+import sys
+import time
+import tracemalloc
+from operator import itemgetter
+import pandas as pd
+from modules.utils import normalizar_serie_clientes
+from modules.periodos import ordinal_periodo
+
+# ==================== INGESTÃO DAS PLANILHAS ====================
+
+# Colunas de BD-FATURAMENTO efetivamente usadas pelo dashboard
+COLUNAS_FATURAMENTO = ['Data', 'Vlr Valido', 'MÊS', 'Descrição', 'ANO', 'tpServ', 'GRUPO CLIENTE']
+
+# Colunas criadas por `derivar_faturamento`
+COLUNAS_DERIVADAS = ['Periodo', 'PERIODO_ORD', 'CLIENTE_KEY']
+
+# Dimensões de texto guardadas como categóricas (poucos valores distintos, muito repetidos)
+COLUNAS_CATEGORICAS = ['GRUPO CLIENTE', 'CLIENTE_KEY', 'tpServ', 'Descrição', 'Periodo']
+
+# Relatório de memória da última compactação feita neste processo
+ULTIMA_COMPACTACAO = {}
+
+def coagir_faturamento(df):
+    """Converte tipos das colunas de faturamento (in-place)"""
+    df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
+    df['Vlr Valido'] = pd.to_numeric(df['Vlr Valido'], errors='coerce')
+    df['MÊS'] = pd.to_numeric(df['MÊS'], errors='coerce')
+    df['ANO'] = pd.to_numeric(df['ANO'], errors='coerce')
+    return df
+
+def derivar_faturamento(df):
+    """Cria as colunas derivadas usadas pelas views (in-place)"""
+    df['Periodo'] = df['Descrição'].astype(str) + '/' + df['ANO'].astype(str)
+    df['PERIODO_ORD'] = ordinal_periodo(df['ANO'], df['MÊS'])
+    df['CLIENTE_KEY'] = normalizar_serie_clientes(df['GRUPO CLIENTE'])
+    return df
+
+def categorizar(df, colunas=COLUNAS_CATEGORICAS):
+    """`df` com as colunas de texto presentes em `colunas` convertidas para categóricas"""
+    conversoes = {c: 'category' for c in colunas
+                  if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)}
+    return df.astype(conversoes) if conversoes else df
+
+def _memoria_bytes(df):
+    return df.memory_usage(deep=True, index=False)
+
+def _em_mb(bytes_):
+    return round(float(bytes_) / 2**20, 2)
+
+def compactar_faturamento(df):
+    """Representação compacta da base limpa, para manter em memória
+
+    - projeta nas colunas usadas (`COLUNAS_FATURAMENTO` + derivadas)
+    - dimensões de texto como categóricas, com as categorias em ordem alfabética
+      (groupby com `observed=True` ordena igual ao texto)
+    - MÊS e ANO em inteiros pequenos quando não há valores ausentes
+    - PERIODO_ORD (Int64 anulável) em int64 do NumPy quando não há valores ausentes
+    - `Vlr Valido` segue em float64: float32 perde os centavos a partir de ~R$ 100 mil
+
+    Grava o relatório de memória (memory_usage deep, antes/depois) em `ULTIMA_COMPACTACAO`.
+    """
+    antes = _memoria_bytes(df)
+    colunas = [c for c in COLUNAS_FATURAMENTO + COLUNAS_DERIVADAS if c in df.columns]
+    compacto = categorizar(df[colunas]).copy()
+    for coluna in ('MÊS', 'ANO'):
+        if coluna in compacto.columns and compacto[coluna].notna().all():
+            compacto[coluna] = pd.to_numeric(compacto[coluna], downcast='integer')
+    if 'PERIODO_ORD' in compacto.columns and compacto['PERIODO_ORD'].notna().all():
+        compacto['PERIODO_ORD'] = compacto['PERIODO_ORD'].to_numpy(dtype='int64')
+    compacto.attrs = dict(df.attrs)
+
+    depois = _memoria_bytes(compacto)
+    ULTIMA_COMPACTACAO.clear()
+    ULTIMA_COMPACTACAO.update({
+        'linhas': len(df),
+        'antes_bytes': int(antes.sum()),
+        'depois_bytes': int(depois.sum()),
+        # Totais somados em bytes e arredondados uma vez só
+        'antes_mb': _em_mb(antes.sum()),
+        'depois_mb': _em_mb(depois.sum()),
+        'colunas': {coluna: {'antes_mb': _em_mb(antes[coluna]), 'depois_mb': _em_mb(depois.get(coluna, 0)),
+                             'dtype': str(compacto[coluna].dtype) if coluna in compacto.columns else 'removida'}
+                    for coluna in antes.index},
+    })
+    return compacto
+
+def motor_excel():
+    """'calamine' (leitor em Rust, bem mais rápido) se instalado; senão o padrão do pandas"""
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return None
+
+def ler_colunas_faturamento(caminho, colunas=None, aba=0):
+    """Lê só as colunas usadas da planilha de faturamento, sem conversão de tipos"""
+    colunas = list(colunas or COLUNAS_FATURAMENTO)
+    return pd.read_excel(caminho, sheet_name=aba, usecols=colunas, engine=motor_excel())[colunas]
+
+def processar_faturamento(caminho):
+    """Lê e limpa a planilha de faturamento"""
+    df = pd.read_excel(caminho)
+    return derivar_faturamento(coagir_faturamento(df))
+
+def processar_ativacoes(caminho):
+    """Lê e limpa a planilha de ativações em andamento"""
+    df = pd.read_excel(caminho, sheet_name='EM ATIVAÇÃO')
+    df['CLIENTE_KEY'] = normalizar_serie_clientes(df['CLIENTE'])
+    df['DATA_PREVISTA'] = pd.to_datetime(df['DATA PREVISTA'], errors='coerce')
+    df['VALOR_MRR'] = pd.to_numeric(df['VALOR TOTAL'], errors='coerce')
+    return df[['CLIENTE', 'CLIENTE_KEY', 'DATA_PREVISTA', 'VALOR_MRR', 'PRODUTO', 'STATUS']].dropna(subset=['DATA_PREVISTA', 'VALOR_MRR'])
+
+# ==================== LEITURA EM STREAMING ====================
+
+def ler_faturamento_streaming(caminho, tamanho_lote=50_000, colunas=None, aba=None):
+    """Lê a planilha de faturamento em modo read-only, em lotes de linhas
+
+    Usa `iter_rows(values_only=True)` do openpyxl, mantendo só as colunas
+    usadas e convertendo os tipos a cada lote, sem carregar o DOM inteiro.
+    """
+    from openpyxl import load_workbook
+
+    colunas = list(colunas or COLUNAS_FATURAMENTO)
+    wb = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        ws = wb[aba] if aba else wb.worksheets[0]
+        linhas = ws.iter_rows(values_only=True)
+        cabecalho = [str(c).strip() if c is not None else '' for c in next(linhas, ())]
+
+        faltantes = [c for c in colunas if c not in cabecalho]
+        if faltantes:
+            raise ValueError(f"Colunas ausentes na planilha: {', '.join(faltantes)}")
+
+        indices = [cabecalho.index(c) for c in colunas]
+        largura = max(indices) + 1
+        selecionar = itemgetter(*indices)
+
+        lotes = []
+        lote = []
+        for linha in linhas:
+            if len(linha) < largura:
+                linha = tuple(linha) + (None,) * (largura - len(linha))
+            valores = selecionar(linha)
+            if len(indices) == 1:
+                valores = (valores,)
+            if all(v is None for v in valores):
+                continue
+            lote.append(valores)
+            if len(lote) >= tamanho_lote:
+                lotes.append(coagir_faturamento(pd.DataFrame.from_records(lote, columns=colunas)))
+                lote = []
+        if lote or not lotes:
+            lotes.append(coagir_faturamento(pd.DataFrame.from_records(lote, columns=colunas)))
+    finally:
+        wb.close()
+
+    df = pd.concat(lotes, ignore_index=True) if len(lotes) > 1 else lotes[0]
+    return derivar_faturamento(df)
+
+# ==================== MÉTRICAS DE INGESTÃO ====================
+
+def medir_ingestao(funcao, *args, **kwargs):
+    """Executa um leitor medindo tempo, linhas/s e pico de memória (tracemalloc)"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        df = funcao(*args, **kwargs)
+        segundos = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    linhas = len(df)
+    return df, {
+        'leitor': getattr(funcao, '__name__', str(funcao)),
+        'linhas': linhas,
+        'segundos': round(segundos, 4),
+        'linhas_por_segundo': round(linhas / segundos, 1) if segundos > 0 else None,
+        'pico_memoria_mb': round(pico / 2**20, 2),
+        'memoria_final_mb': round(df.memory_usage(deep=True).sum() / 2**20, 2),
+    }
+
+def comparar_ingestao(caminho='BD-FATURAMENTO.xlsx', tamanho_lote=50_000):
+    """Compara a leitura completa (read_excel) com a leitura em streaming"""
+    _, completa = medir_ingestao(processar_faturamento, caminho)
+    _, streaming = medir_ingestao(ler_faturamento_streaming, caminho, tamanho_lote=tamanho_lote)
+    return [completa, streaming]
+
+if __name__ == '__main__':
+    print(json.dumps(comparar_ingestao(*sys.argv[1:2]), indent=2, ensure_ascii=False))
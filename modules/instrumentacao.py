@@ -0,0 +1,125 @@
+import cProfile
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# ==================== INSTRUMENTAÇÃO ====================
+# Tempo de cada etapa de uma execução (render das páginas, carga das bases,
+# agregação, previsão, gráficos e tabelas). `medir_etapa` funciona como
+# `with` e como decorador; etapas aninhadas guardam o nível. A coleta é por
+# thread: cada execução do script do Streamlit roda na sua. Reexecuções só
+# de um fragmento abrem uma execução própria (`iniciar_fragmento`). As etapas
+# vão para o painel de debug (?debug=1) e, se ligado, para o logger
+# `telco.tempos`, uma linha JSON por etapa.
+
+logger = logging.getLogger('telco.tempos')
+_local = threading.local()
+
+def configurar_log_json(destino=None):
+    """Envia as linhas JSON de `telco.tempos` para `destino` (stderr por padrão); idempotente"""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler(destino)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+def iniciar_execucao(**contexto):
+    """Começa a coleta de uma nova execução, descartando as etapas da anterior"""
+    _local.execucao = {
+        'id': uuid.uuid4().hex[:8],
+        'inicio': time.perf_counter(),
+        'contexto': contexto,
+        'etapas': [],
+        'nivel': 0,
+    }
+    return _local.execucao
+
+def iniciar_fragmento(nome):
+    """Começa uma nova execução se o fragmento roda sozinho (nenhuma etapa aberta)
+
+    Numa execução completa o fragmento é chamado dentro da etapa da página e
+    entra na mesma execução; reexecutado sozinho, não deixa as etapas se
+    acumularem na execução anterior.
+    """
+    execucao = getattr(_local, 'execucao', None)
+    if execucao is None or execucao['nivel'] == 0:
+        iniciar_execucao(fragmento=nome)
+
+def _execucao_atual():
+    execucao = getattr(_local, 'execucao', None)
+    return execucao if execucao is not None else iniciar_execucao()
+
+def etapas_da_execucao():
+    """Etapas da execução atual, na ordem em que começaram"""
+    return list(_execucao_atual()['etapas'])
+
+@contextmanager
+def medir_etapa(nome, **detalhes):
+    """Mede o tempo do bloco (ou da função decorada) como uma etapa da execução atual
+
+    O dicionário da etapa é devolvido pelo `with`, para acrescentar detalhes (ex.: linhas).
+    """
+    execucao = _execucao_atual()
+    etapa = {
+        'etapa': nome,
+        'nivel': execucao['nivel'],
+        'inicio_ms': round((time.perf_counter() - execucao['inicio']) * 1000, 1),
+        **detalhes,
+    }
+    execucao['etapas'].append(etapa)
+    execucao['nivel'] += 1
+    inicio = time.perf_counter()
+    try:
+        yield etapa
+    except BaseException as erro:
+        # Inclui as exceções de controle do Streamlit (st.rerun, st.stop)
+        etapa['interrompida'] = type(erro).__name__
+        raise
+    finally:
+        etapa['ms'] = round((time.perf_counter() - inicio) * 1000, 2)
+        execucao['nivel'] -= 1
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({'execucao': execucao['id'], **execucao['contexto'], **etapa},
+                                   ensure_ascii=False, default=str))
+
+# ==================== PERFIL DE UMA EXECUÇÃO ====================
+
+@contextmanager
+def perfilar(linhas=40):
+    """Perfila o bloco com o pyinstrument (se instalado) ou o cProfile
+
+    O dicionário devolvido pelo `with` recebe a ferramenta usada e o relatório em texto ao final.
+    """
+    perfil = {'ferramenta': None, 'relatorio': ''}
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        Profiler = None
+
+    if Profiler is not None:
+        perfil['ferramenta'] = 'pyinstrument'
+        perfilador = Profiler()
+        perfilador.start()
+        try:
+            yield perfil
+        finally:
+            perfilador.stop()
+            perfil['relatorio'] = perfilador.output_text(unicode=True, color=False)
+    else:
+        perfil['ferramenta'] = 'cProfile'
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+        try:
+            yield perfil
+        finally:
+            perfilador.disable()
+            saida = io.StringIO()
+            pstats.Stats(perfilador, stream=saida).sort_stats('cumulative').print_stats(linhas)
+            perfil['relatorio'] = saida.getvalue()
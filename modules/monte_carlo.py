@@ -0,0 +1,127 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from modules.config import RISCO_POR_STATUS, RISCO_STATUS_PADRAO, SIMULACOES_MONTE_CARLO, PROCESSOS_MONTE_CARLO
+from modules.periodos import calendario_periodos
+from modules.motor_previsao import base_ultimo_periodo
+from modules.cenarios import deslocar_meses, clientes_das_ativacoes
+from modules.utils import calcular_valor_proporcional_serie
+
+# ==================== SIMULAÇÃO DE RISCO (MONTE CARLO) ====================
+# Em cada simulação, cada ativação acontece ou não (probabilidade do STATUS)
+# e entra com um atraso sorteado (Poisson com a média do STATUS, em meses).
+# A receita da base (último mês repetido) é fixa; o que varia é o MRR das
+# ativações. As simulações rodam em lotes vetorizados (simulações x
+# ativações), opcionalmente num pool de processos; cada lote tem a sua
+# semente derivada, então o resultado não depende do número de processos.
+
+LOTE_SIMULACOES = 2_000
+PERCENTIS = {'P10': 10, 'P50': 50, 'P90': 90}
+
+def parametros_risco(status, risco=None, padrao=None):
+    """(probabilidade, atraso médio em meses) de cada ativação, pelo STATUS"""
+    risco = RISCO_POR_STATUS if risco is None else risco
+    padrao = RISCO_STATUS_PADRAO if padrao is None else padrao
+    chaves = pd.Series(status, dtype=object).fillna('').astype(str).str.strip().str.upper()
+    probabilidade = chaves.map({k.upper(): v['probabilidade'] for k, v in risco.items()})
+    atraso_medio = chaves.map({k.upper(): v['atraso_medio'] for k, v in risco.items()})
+    return (probabilidade.fillna(padrao['probabilidade']).to_numpy(dtype=float),
+            atraso_medio.fillna(padrao['atraso_medio']).to_numpy(dtype=float))
+
+def simular_lote(semente, simulacoes, probabilidade, atraso_medio, atraso_maximo, entradas, proporcional, mrr,
+                 grupos, base_grupos, meses):
+    """Receita das ativações por mês em `simulacoes` sorteios (array simulações x meses)
+
+    `entradas[d, a]` e `proporcional[d, a]`: índice do mês de entrada na previsão
+    (negativo = antes do primeiro mês) e valor proporcional da ativação `a` com
+    `d` meses de atraso. Atrasos acima de `atraso_maximo[a]` já caem fora do horizonte.
+    Ativações de clientes com faturamento negativo no último mês ficam no grupo do
+    cliente (`grupos` > 0): a receita dele entra só quando base + ativações é positiva.
+    """
+    rng = np.random.default_rng(semente)
+    quantidade = len(mrr)
+    colunas = np.arange(quantidade)
+    ocorre = rng.random((simulacoes, quantidade)) < probabilidade
+    atraso = np.minimum(rng.poisson(atraso_medio, (simulacoes, quantidade)), atraso_maximo)
+    entrada = entradas[atraso, colunas]
+
+    # Uma faixa de meses + 1 posições por (simulação, grupo) nos bincounts
+    faixas = len(base_grupos) + 1
+    deslocamento = (np.arange(simulacoes)[:, None] * faixas + grupos[None, :]) * (meses + 1)
+    tamanho = simulacoes * faixas * (meses + 1)
+
+    # MRR cheio do mês seguinte à entrada em diante: marca o início e acumula
+    inicio_cheio = deslocamento + np.clip(entrada + 1, 0, meses)
+    cheio = np.bincount(inicio_cheio[ocorre], weights=np.broadcast_to(mrr, ocorre.shape)[ocorre], minlength=tamanho)
+    receita = cheio.reshape(simulacoes, faixas, meses + 1).cumsum(axis=2)[:, :, :meses]
+
+    # Valor proporcional no próprio mês de entrada, quando ele cai no horizonte
+    no_horizonte = ocorre & (entrada >= 0) & (entrada < meses)
+    parcial = np.bincount((deslocamento + np.clip(entrada, 0, meses))[no_horizonte],
+                          weights=proporcional[atraso, colunas][no_horizonte], minlength=tamanho)
+    receita = receita + parcial.reshape(simulacoes, faixas, meses + 1)[:, :, :meses]
+
+    clientes_negativos = np.maximum(base_grupos[None, :, None] + receita[:, 1:, :], 0.0).sum(axis=1)
+    return receita[:, 0, :] + clientes_negativos
+
+def _simular_lote_args(argumentos):
+    return simular_lote(*argumentos)
+
+def simular_monte_carlo(df, df_ativacoes, meses_futuros, simulacoes=SIMULACOES_MONTE_CARLO, semente=0,
+                        processos=PROCESSOS_MONTE_CARLO, risco=None):
+    """Faixas do faturamento previsto por mês: P10, P50, P90 e média das simulações
+
+    Colunas: PERIODO_ORD, Periodo, MÊS, ANO, P10, P50, P90, Media. Com todas as
+    ativações certas e sem atraso, as três faixas coincidem com a previsão padrão.
+    """
+    ultimo_ordinal, df_ultimo = base_ultimo_periodo(df)
+    base_clientes = df_ultimo.groupby('GRUPO CLIENTE', observed=True)['Vlr Valido'].sum()
+    receita_base = float(base_clientes.clip(lower=0).sum())
+    calendario = calendario_periodos(ultimo_ordinal + 1, ultimo_ordinal + meses_futuros)
+
+    totais = np.full((simulacoes, meses_futuros), receita_base)
+    ativ = df_ativacoes[df_ativacoes['DATA_PREVISTA'].notna()].reset_index(drop=True) if not df_ativacoes.empty else df_ativacoes
+    if len(ativ) and meses_futuros > 0 and simulacoes > 0:
+        probabilidade, atraso_medio = parametros_risco(ativ['STATUS'], risco)
+        mrr = ativ['VALOR_MRR'].to_numpy(dtype=float)
+
+        # Clientes da base com faturamento negativo que recebem ativações: um grupo cada
+        linhas, _ = clientes_das_ativacoes(ativ, df_ultimo, base_clientes)
+        valores_base = base_clientes.to_numpy(dtype=float)
+        negativas = linhas < len(valores_base)
+        negativas[negativas] = valores_base[linhas[negativas]] < 0
+        codigos, clientes_negativos = pd.factorize(linhas[negativas])
+        grupos = np.zeros(len(ativ), dtype=np.int64)
+        grupos[negativas] = codigos + 1
+        base_grupos = valores_base[clientes_negativos]
+
+        datas = ativ['DATA_PREVISTA'].to_numpy().astype('datetime64[D]')
+
+        # Entrada e proporcional de cada ativação para cada atraso possível dentro do horizonte
+        entrada_sem_atraso = datas.astype('datetime64[M]').astype(np.int64) + 1970 * 12 - (ultimo_ordinal + 1)
+        atraso_maximo = np.clip(meses_futuros - entrada_sem_atraso, 0, None)
+        atrasos = np.arange(int(atraso_maximo.max()) + 1)[:, None]
+        entradas = entrada_sem_atraso[None, :] + atrasos
+        deslocadas = deslocar_meses(datas[None, :], atrasos)
+        proporcional = calcular_valor_proporcional_serie(
+            deslocadas.ravel(), np.tile(mrr, len(atrasos))).reshape(deslocadas.shape)
+
+        tamanhos = [min(LOTE_SIMULACOES, simulacoes - inicio) for inicio in range(0, simulacoes, LOTE_SIMULACOES)]
+        sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+        lotes = [(s, tamanho, probabilidade, atraso_medio, atraso_maximo, entradas, proporcional, mrr,
+                  grupos, base_grupos, meses_futuros)
+                 for s, tamanho in zip(sementes, tamanhos)]
+        if processos and processos > 1 and len(lotes) > 1:
+            with ProcessPoolExecutor(max_workers=min(processos, len(lotes)),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                receitas = list(executor.map(_simular_lote_args, lotes))
+        else:
+            receitas = [simular_lote(*lote) for lote in lotes]
+        totais += np.concatenate(receitas)
+
+    faixas = calendario[['PERIODO_ORD', 'Periodo', 'MÊS', 'ANO']].copy()
+    for nome, valor in zip(PERCENTIS, np.percentile(totais, list(PERCENTIS.values()), axis=0)):
+        faixas[nome] = valor
+    faixas['Media'] = totais.mean(axis=0)
+    return faixas
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+from modules.periodos import MESES_NOME, ordinal_de_datas, ordinal_periodo, ano_mes_do_ordinal, calendario_periodos
+from modules.utils import (normalizar_nome_cliente, normalizar_serie_clientes,
+                           calcular_valor_proporcional, calcular_valor_proporcional_serie)
+
+# ==================== MOTOR DE PREVISÃO ====================
+# Previsão mês a mês por cliente: faturamento do último mês repetido mais o
+# MRR das ativações em andamento. Python puro (sem Streamlit).
+
+COLUNAS_PREVISAO = ['Cliente', 'Periodo', 'MÊS', 'ANO', 'Valor', 'Tipo']
+
+def construir_indice_clientes(df):
+    """Índice hash CLIENTE_KEY -> GRUPO CLIENTE (primeiro nome em ordem alfabética)"""
+    if df.empty:
+        return {}
+    clientes = df[['GRUPO CLIENTE']].assign(
+        CLIENTE_KEY=df['CLIENTE_KEY'] if 'CLIENTE_KEY' in df.columns else normalizar_serie_clientes(df['GRUPO CLIENTE'])
+    ).dropna(subset=['GRUPO CLIENTE'])
+    clientes = clientes.drop_duplicates().sort_values('GRUPO CLIENTE').drop_duplicates('CLIENTE_KEY')
+    return dict(zip(clientes['CLIENTE_KEY'], clientes['GRUPO CLIENTE']))
+
+def base_ultimo_periodo(df):
+    """Ordinal do último período faturado e as linhas desse período"""
+    ordinais = df['PERIODO_ORD'] if 'PERIODO_ORD' in df.columns else ordinal_periodo(df['ANO'], df['MÊS'])
+    ultimo_ordinal = int(ordinais.max())
+    return ultimo_ordinal, df[ordinais == ultimo_ordinal]
+
+def gerar_previsao_com_ativacoes(df, df_ativacoes, meses_futuros=6):
+    """Gera previsão baseada em ativações reais (motor vetorizado)
+
+    Monta de uma vez a matriz mês x ativação com a contribuição de cada
+    ativação (proporcional no mês de entrada, MRR cheio nos seguintes) e
+    soma por cliente com merges do pandas. Produz o mesmo resultado de
+    `gerar_previsao_com_ativacoes_referencia`.
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    ultimo_ordinal, df_ultimo = base_ultimo_periodo(df)
+    base_clientes = df_ultimo.groupby('GRUPO CLIENTE', observed=True)['Vlr Valido'].sum()
+
+    # Calendário da previsão: um ordinal por mês futuro
+    calendario = calendario_periodos(ultimo_ordinal + 1, ultimo_ordinal + meses_futuros)
+    ordinais = calendario['PERIODO_ORD'].to_numpy()
+    meses = calendario['MÊS'].to_numpy()
+    anos = calendario['ANO'].to_numpy()
+    periodos = calendario['Periodo'].to_numpy(dtype=object)
+
+    # Matriz base: cliente x mês com o faturamento do último mês repetido
+    valores_base = np.repeat(base_clientes.to_numpy(dtype=float)[:, None], meses_futuros, axis=1)
+    partes = []
+
+    if not df_ativacoes.empty and meses_futuros > 0:
+        ativ = df_ativacoes[df_ativacoes['DATA_PREVISTA'].notna()].reset_index(drop=True)
+        datas = ativ['DATA_PREVISTA']
+        ordinal_ativ = ordinal_de_datas(datas)
+        mrr = ativ['VALOR_MRR'].to_numpy(dtype=float)
+        proporcional = calcular_valor_proporcional_serie(datas.to_numpy(), mrr)
+
+        # Contribuição mês x ativação: proporcional no mês de entrada, cheio depois
+        entrada = ordinal_ativ[None, :] == ordinais[:, None]
+        anterior = ordinal_ativ[None, :] < ordinais[:, None]
+        contribuicao = np.where(entrada, proporcional[None, :], mrr[None, :])
+        idx_mes, idx_ativ = np.nonzero(entrada | anterior)
+
+        contrib = pd.DataFrame({
+            'idx_mes': idx_mes,
+            'ordem': idx_ativ,
+            'Valor': contribuicao[idx_mes, idx_ativ],
+            'CLIENTE': ativ['CLIENTE'].to_numpy()[idx_ativ],
+            'CLIENTE_KEY': ativ['CLIENTE_KEY'].to_numpy()[idx_ativ],
+        })
+
+        # Casamento com a base: lookup O(1) pela chave normalizada do cliente
+        indice_base = construir_indice_clientes(df_ultimo)
+        contrib['Cliente'] = contrib['CLIENTE_KEY'].map(indice_base)
+        existentes = contrib['Cliente'].notna()
+
+        if existentes.any():
+            soma = contrib[existentes].groupby(['Cliente', 'idx_mes'])['Valor'].sum()
+            linhas = base_clientes.index.get_indexer(soma.index.get_level_values('Cliente'))
+            np.add.at(valores_base, (linhas, soma.index.get_level_values('idx_mes')), soma.to_numpy())
+
+        # Clientes novos: nome da primeira ativação (na ordem da planilha) de cada chave
+        novos = (contrib[~existentes]
+                 .groupby(['idx_mes', 'CLIENTE_KEY'], sort=False)
+                 .agg(Cliente=('CLIENTE', 'first'), Valor=('Valor', 'sum'), ordem=('ordem', 'min'))
+                 .reset_index())
+        partes.append(novos.assign(grupo=1)[['idx_mes', 'Cliente', 'Valor', 'grupo', 'ordem']])
+
+    base = pd.DataFrame({
+        'idx_mes': np.tile(np.arange(meses_futuros), len(base_clientes)),
+        'Cliente': np.repeat(base_clientes.index.to_numpy(), meses_futuros),
+        'Valor': valores_base.ravel(),
+        'grupo': 0,
+        'ordem': np.repeat(np.arange(len(base_clientes)), meses_futuros),
+    })
+    previsoes = pd.concat([base] + [p for p in partes if not p.empty], ignore_index=True)
+    previsoes = previsoes[previsoes['Valor'] > 0].sort_values(['idx_mes', 'grupo', 'ordem'], kind='stable')
+    idx = previsoes['idx_mes'].to_numpy(dtype=int)
+
+    return pd.DataFrame({
+        'Cliente': previsoes['Cliente'].to_numpy(),
+        'Periodo': periodos[idx],
+        'MÊS': meses[idx],
+        'ANO': anos[idx],
+        'Valor': previsoes['Valor'].to_numpy(dtype=float),
+        'Tipo': 'Previsto',
+    }, columns=COLUNAS_PREVISAO)
+
+def gerar_previsao_com_ativacoes_referencia(df, df_ativacoes, meses_futuros=6):
+    """Gera previsão baseada em ativações reais (implementação de referência, laço por linha)"""
+    if df.empty:
+        return pd.DataFrame()
+    
+    ultimo_ordinal, df_ultimo = base_ultimo_periodo(df)
+    base_clientes = df_ultimo.groupby('GRUPO CLIENTE', observed=True)['Vlr Valido'].sum().to_dict()
+    
+    previsoes = []
+    ano_atual, mes_atual = ano_mes_do_ordinal(ultimo_ordinal)
+    
+    meses_nome = MESES_NOME
+    
+    for i in range(1, meses_futuros + 1):
+        mes_atual += 1
+        if mes_atual > 12:
+            mes_atual = 1
+            ano_atual += 1
+        
+        periodo_nome = f"{meses_nome[mes_atual]}/{ano_atual}"
+        data_mes = pd.Timestamp(year=ano_atual, month=mes_atual, day=1)
+        previsao_mes = base_clientes.copy()
+        
+        if not df_ativacoes.empty:
+            for _, ativ in df_ativacoes.iterrows():
+                data_ativ = ativ['DATA_PREVISTA']
+                if pd.notna(data_ativ) and data_ativ < data_mes + pd.DateOffset(months=1):
+                    if data_ativ.year == ano_atual and data_ativ.month == mes_atual:
+                        valor = calcular_valor_proporcional(data_ativ, ativ['VALOR_MRR'])
+                    elif data_ativ < data_mes:
+                        valor = ativ['VALOR_MRR']
+                    else:
+                        continue
+                    
+                    cliente_key = None
+                    for k in previsao_mes.keys():
+                        if normalizar_nome_cliente(k) == ativ['CLIENTE_KEY']:
+                            cliente_key = k
+                            break
+                    
+                    if cliente_key:
+                        previsao_mes[cliente_key] += valor
+                    else:
+                        previsao_mes[ativ['CLIENTE']] = valor
+        
+        for cliente, valor in previsao_mes.items():
+            if valor > 0:
+                previsoes.append({
+                    'Cliente': cliente,
+                    'Periodo': periodo_nome,
+                    'MÊS': mes_atual,
+                    'ANO': ano_atual,
+                    'Valor': valor,
+                    'Tipo': 'Previsto'
+                })
+    
+    return pd.DataFrame(previsoes)
+
+def validar_previsao_vetorizada(df, df_ativacoes, meses_futuros=6, rtol=1e-9):
+    """Confere o motor vetorizado contra a implementação de referência"""
+    vetorizada = gerar_previsao_com_ativacoes(df, df_ativacoes, meses_futuros)
+    referencia = gerar_previsao_com_ativacoes_referencia(df, df_ativacoes, meses_futuros)
+    if referencia.empty:
+        return vetorizada.empty
+    try:
+        pd.testing.assert_frame_equal(
+            vetorizada.reset_index(drop=True),
+            referencia[COLUNAS_PREVISAO].reset_index(drop=True),
+            check_dtype=False,
+            rtol=rtol
+        )
+        return True
+    except AssertionError:
+        return False
@@ -0,0 +1,135 @@
+import fnmatch
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from modules.cache_disco import hash_arquivo
+from modules.ingestao import COLUNAS_FATURAMENTO, motor_excel, coagir_faturamento, derivar_faturamento
+
+# ==================== INGESTÃO DE MÚLTIPLAS PLANILHAS ====================
+# Bases de faturamento divididas em vários arquivos e/ou abas (um por ano,
+# por filial...). Cada planilha é lida num processo separado: o parse do
+# Excel é CPU-bound e não escala com threads. O resultado concatenado tem o
+# mesmo esquema de `processar_faturamento_incremental`. Os processos são
+# criados com 'spawn': um fork do servidor do Streamlit (multithread) pode
+# herdar locks presos por outras threads.
+
+# Última carga: tempo e linhas por planilha (consultado pelo painel de debug)
+ULTIMA_CARGA = {}
+
+def descobrir_planilhas(diretorio, padrao='*.xlsx', padrao_abas='*'):
+    """Lista (arquivo, aba) das planilhas do diretório, em ordem de nome e de aba"""
+    motor = motor_excel()
+    fontes = []
+    for caminho in sorted(glob.glob(os.path.join(diretorio, padrao))):
+        if os.path.basename(caminho).startswith('~$'):
+            continue  # arquivo de lock do Excel
+        with pd.ExcelFile(caminho, engine=motor) as livro:
+            abas = livro.sheet_names
+        fontes.extend((caminho, aba) for aba in abas if fnmatch.fnmatchcase(aba, padrao_abas))
+    return fontes
+
+def _validar_colunas(caminho, aba, presentes, colunas):
+    """None se a aba não tem nenhuma coluna da base (aba auxiliar); erro se tem só parte delas"""
+    faltantes = [c for c in colunas if c not in presentes]
+    if len(faltantes) == len(colunas):
+        return None
+    if faltantes:
+        raise ValueError(f"{os.path.basename(caminho)} [{aba}]: colunas ausentes: {', '.join(faltantes)}")
+    return True
+
+def ler_planilha(fonte, colunas=None):
+    """Lê, converte e deriva uma planilha (arquivo, aba); executado nos processos do pool
+
+    Retorna (df, relatório) ou (None, relatório) para abas sem as colunas da base.
+    """
+    caminho, aba = fonte
+    colunas = list(colunas or COLUNAS_FATURAMENTO)
+    inicio = time.perf_counter()
+    brutas = pd.read_excel(caminho, sheet_name=aba, engine=motor_excel(),
+                           usecols=lambda c: str(c).strip() in colunas)
+    brutas.columns = [str(c).strip() for c in brutas.columns]
+    relatorio = {'arquivo': os.path.basename(caminho), 'aba': aba}
+
+    if _validar_colunas(caminho, aba, set(brutas.columns), colunas) is None:
+        relatorio.update(linhas=0, ignorada=True, segundos=round(time.perf_counter() - inicio, 4))
+        return None, relatorio
+
+    brutas = brutas[colunas]
+    preenchidas = brutas.notna().sum()
+    df = coagir_faturamento(brutas)
+    # Valores que existiam na planilha mas não converteram para data/número
+    invalidos = (preenchidas - df.notna().sum())
+    df = derivar_faturamento(df)
+    relatorio.update(linhas=len(df), ignorada=False,
+                     valores_invalidos={c: int(n) for c, n in invalidos.items() if n},
+                     segundos=round(time.perf_counter() - inicio, 4))
+    return df, relatorio
+
+def _validar_tipos(partes):
+    """Confere que as planilhas chegaram com os mesmos tipos de coluna antes de concatenar"""
+    referencia_relatorio, referencia = partes[0]
+    for relatorio, df in partes[1:]:
+        # Numéricos de largura diferente (int/float) e colunas inteiramente vazias se combinam no concat
+        diferentes = [c for c in referencia.columns
+                      if df[c].dtype != referencia[c].dtype and not df[c].isna().all()
+                      and not (pd.api.types.is_numeric_dtype(df[c]) and pd.api.types.is_numeric_dtype(referencia[c]))]
+        if diferentes:
+            detalhes = ', '.join(f'{c} ({df[c].dtype} x {referencia[c].dtype})' for c in diferentes)
+            raise ValueError(f"{relatorio['arquivo']} [{relatorio['aba']}]: tipos incompatíveis com "
+                             f"{referencia_relatorio['arquivo']} [{referencia_relatorio['aba']}]: {detalhes}")
+
+def versao_planilhas(fontes):
+    """Hash do conjunto de arquivos lidos (equivalente ao `attrs['versao']` de um arquivo único)"""
+    digest = hashlib.sha256()
+    for caminho in sorted({caminho for caminho, _ in fontes}):
+        digest.update(os.path.basename(caminho).encode('utf-8'))
+        digest.update(hash_arquivo(caminho).encode('ascii'))
+    return digest.hexdigest()
+
+def carregar_planilhas(diretorio, padrao='*.xlsx', padrao_abas='*', colunas=None, max_processos=None):
+    """Lê em paralelo todas as planilhas de faturamento do diretório e concatena
+
+    As linhas saem na ordem (arquivo, aba, linha). Com uma planilha só, ou
+    `max_processos=1`, a leitura é feita no próprio processo.
+    """
+    inicio = time.perf_counter()
+    fontes = descobrir_planilhas(diretorio, padrao, padrao_abas)
+    if not fontes:
+        raise FileNotFoundError(f"Nenhuma planilha '{padrao}' encontrada em {diretorio}")
+
+    processos = min(len(fontes), max_processos or os.cpu_count() or 1)
+    if processos > 1:
+        with ProcessPoolExecutor(max_workers=processos,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            resultados = list(executor.map(ler_planilha, fontes, [colunas] * len(fontes)))
+    else:
+        resultados = [ler_planilha(fonte, colunas) for fonte in fontes]
+
+    relatorios = [relatorio for _, relatorio in resultados]
+    partes = [(relatorio, df) for df, relatorio in resultados if df is not None]
+    if not partes:
+        raise ValueError(f"Nenhuma aba em {diretorio} tem as colunas da base de faturamento")
+    _validar_tipos(partes)
+
+    df = pd.concat([df for _, df in partes], ignore_index=True) if len(partes) > 1 else partes[0][1]
+    df.attrs['versao'] = versao_planilhas(fontes)
+
+    soma = sum(r['segundos'] for r in relatorios)
+    total = time.perf_counter() - inicio
+    ULTIMA_CARGA.clear()
+    ULTIMA_CARGA.update(planilhas=relatorios, linhas=len(df), processos=processos,
+                        segundos=round(total, 4), soma_segundos_planilhas=round(soma, 4),
+                        aceleracao=round(soma / total, 2) if total > 0 else None)
+    return df
+
+if __name__ == '__main__':
+    argumentos = sys.argv[1:]
+    carregar_planilhas(argumentos[0] if argumentos else '.',
+                       *argumentos[1:2], max_processos=int(argumentos[2]) if len(argumentos) > 2 else None)
+    print(json.dumps(ULTIMA_CARGA, indent=2, ensure_ascii=False))
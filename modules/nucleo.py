@@ -0,0 +1,159 @@
+import os
+import numpy as np
+import pandas as pd
+from modules.cache_disco import carregar_com_cache, versao_dados
+from modules.config import (ARQUIVO_FATURAMENTO, ARQUIVO_ATIVACOES, DIRETORIO_FATURAMENTO,
+                            PADRAO_PLANILHAS_FATURAMENTO, HORIZONTE_PREVISAO_MESES)
+from modules.cubo import construir_cubo
+from modules.periodos import ordinal_periodo
+from modules.ingestao import processar_ativacoes, compactar_faturamento, categorizar
+from modules.incremental import processar_faturamento_incremental, cubo_das_particoes
+from modules.multiarquivo import carregar_planilhas
+from modules.motor_previsao import gerar_previsao_com_ativacoes, base_ultimo_periodo
+from modules.cenarios import normalizar_cenarios, totais_cenarios
+from modules.monte_carlo import simular_monte_carlo
+
+# ==================== NÚCLEO DE ANÁLISE ====================
+# Carga, limpeza, agregação e previsão em Python puro, sem Streamlit: usado
+# pelo dashboard (via modules/data_loader.py), pela CLI (modules/cli.py),
+# por notebooks e benchmarks. Erros sobem como exceções; quem chama decide
+# como exibi-los.
+
+# ==================== CACHE PLUGÁVEL ====================
+# Resultados derivados (cubo, previsão) ficam guardados pela versão dos dados
+# em qualquer MutableMapping com chaves str: dict (padrão, em memória do
+# processo), um LRU, `shelve` (em disco)... `None` desliga o cache.
+
+_armazenamento = {}
+
+def configurar_cache(armazenamento):
+    """Define onde o núcleo guarda resultados derivados (MutableMapping ou None)"""
+    global _armazenamento
+    _armazenamento = armazenamento
+
+def memoizar(nome, partes, calcular):
+    """Resultado guardado em 'nome:parte1:parte2...', chamando `calcular()` só na primeira vez"""
+    if _armazenamento is None:
+        return calcular()
+    chave = ':'.join([nome] + [str(parte) for parte in partes])
+    try:
+        return _armazenamento[chave]
+    except KeyError:
+        pass
+    resultado = calcular()
+    _armazenamento[chave] = resultado
+    return resultado
+
+# ==================== CARGA ====================
+
+def carregar_faturamento(caminho=ARQUIVO_FATURAMENTO, diretorio=DIRETORIO_FATURAMENTO):
+    """Base de faturamento limpa e compactada: todas as planilhas de `diretorio` (se existir) ou o arquivo `caminho`"""
+    if diretorio and os.path.isdir(diretorio):
+        df = carregar_planilhas(diretorio, PADRAO_PLANILHAS_FATURAMENTO)
+    else:
+        df = carregar_com_cache(caminho, processar_faturamento_incremental)
+    return compactar_faturamento(df)
+
+def carregar_ativacoes(caminho=ARQUIVO_ATIVACOES):
+    """Base de ativações em andamento limpa"""
+    return carregar_com_cache(caminho, processar_ativacoes)
+
+def _somente_leitura(valores):
+    """Visão do array que recusa escrita (o array original continua gravável)"""
+    visao = valores.view()
+    visao.flags.writeable = False
+    return visao
+
+def congelar(df):
+    """Versão somente leitura de `df` para compartilhar entre sessões/threads, sem copiar os dados
+
+    Contrato: os valores não podem ser alterados (`df.loc[...] = ...` levanta
+    erro), mas nada impede criar colunas (`df['nova'] = ...`) no objeto
+    compartilhado - quem precisar de colunas novas deriva uma cópia.
+    Colunas NumPy viram visões somente leitura do próprio array; categóricas
+    são remontadas sobre os códigos somente leitura; anuláveis (Int64,
+    boolean...) são convertidas para NumPy (`to_numpy`: ausentes viram NaN,
+    ou None nas booleanas) antes de congelar. `df` continua gravável.
+    Levanta TypeError com outros dtypes.
+    """
+    colunas = {}
+    for nome, serie in df.items():
+        if isinstance(serie.dtype, np.dtype):
+            valores = _somente_leitura(serie.to_numpy(copy=False))
+        elif isinstance(serie.dtype, pd.CategoricalDtype):
+            valores = pd.Categorical.from_codes(_somente_leitura(serie.cat.codes.to_numpy()), dtype=serie.dtype)
+        elif pd.api.types.is_numeric_dtype(serie.dtype) or pd.api.types.is_bool_dtype(serie.dtype):
+            valores = _somente_leitura(serie.to_numpy())
+        else:
+            raise TypeError(f"congelar: dtype sem suporte na coluna {nome!r}: {serie.dtype}")
+        colunas[nome] = valores
+    congelado = pd.DataFrame(colunas, index=df.index, copy=False)
+    congelado.attrs = dict(df.attrs)
+    return congelado
+
+# ==================== AGREGAÇÃO ====================
+
+def calcular_cubo(df):
+    """Cubo de agregação da base (montado dos cubos das partições quando possível), com dimensões categóricas"""
+    cubo = cubo_das_particoes(df.attrs.get('particoes'))
+    return categorizar(cubo if cubo is not None else construir_cubo(df))
+
+def obter_cubo(df):
+    """`calcular_cubo` uma vez por versão da base"""
+    return memoizar('cubo', [versao_dados(df)], lambda: calcular_cubo(df))
+
+# ==================== PREVISÃO ====================
+
+def horizonte_previsao(meses_futuros):
+    """Horizonte efetivamente calculado para um pedido de `meses_futuros` meses"""
+    return max(HORIZONTE_PREVISAO_MESES, meses_futuros)
+
+def calcular_previsao(df, df_ativacoes, horizonte):
+    """(ordinal do último mês faturado, previsão no horizonte com PERIODO_ORD)"""
+    previsao = gerar_previsao_com_ativacoes(df, df_ativacoes, horizonte)
+    if previsao.empty:
+        return None, previsao
+    previsao['PERIODO_ORD'] = ordinal_periodo(previsao['ANO'], previsao['MÊS'])
+    ultimo_ordinal, _ = base_ultimo_periodo(df)
+    return ultimo_ordinal, previsao
+
+def fatiar_previsao(ultimo_ordinal, previsao, meses_futuros):
+    """Recorte dos primeiros `meses_futuros` meses de uma previsão de horizonte maior
+
+    Cada mês só depende da base e das ativações até ele, então o recorte é
+    igual a recalcular com o horizonte menor.
+    """
+    if previsao.empty:
+        return previsao
+    return previsao[previsao['PERIODO_ORD'] <= ultimo_ordinal + meses_futuros].reset_index(drop=True)
+
+def obter_previsao(df, df_ativacoes, meses_futuros):
+    """Previsão dos próximos `meses_futuros` meses, calculada uma vez por versão das duas bases"""
+    horizonte = horizonte_previsao(meses_futuros)
+    ultimo_ordinal, previsao = memoizar(
+        'previsao', [versao_dados(df), versao_dados(df_ativacoes), horizonte],
+        lambda: calcular_previsao(df, df_ativacoes, horizonte))
+    return fatiar_previsao(ultimo_ordinal, previsao, meses_futuros)
+
+def calcular_monte_carlo(df, df_ativacoes, horizonte):
+    """(ordinal do último mês faturado, faixas P10/P50/P90 da simulação de risco no horizonte)"""
+    ultimo_ordinal, _ = base_ultimo_periodo(df)
+    return ultimo_ordinal, simular_monte_carlo(df, df_ativacoes, horizonte)
+
+def obter_monte_carlo(df, df_ativacoes, meses_futuros):
+    """Faixas da simulação de risco dos próximos `meses_futuros` meses, uma vez por versão das duas bases
+
+    Os sorteios de cada ativação não dependem do horizonte: o recorte é igual a simular menos meses.
+    """
+    horizonte = horizonte_previsao(meses_futuros)
+    ultimo_ordinal, faixas = memoizar(
+        'monte_carlo', [versao_dados(df), versao_dados(df_ativacoes), horizonte],
+        lambda: calcular_monte_carlo(df, df_ativacoes, horizonte))
+    return fatiar_previsao(ultimo_ordinal, faixas, meses_futuros)
+
+def obter_cenarios(df, df_ativacoes, cenarios, meses_futuros):
+    """`totais_cenarios` calculado uma vez por versão das duas bases e tabela de cenários"""
+    tabela = normalizar_cenarios(cenarios)
+    return memoizar(
+        'cenarios', [versao_dados(df), versao_dados(df_ativacoes), meses_futuros, tabela.to_json(orient='values')],
+        lambda: totais_cenarios(df, df_ativacoes, tabela, meses_futuros))
@@ -0,0 +1,144 @@
+import functools
+import importlib
+import time
+import pandas as pd
+import streamlit as st
+from modules.data_loader import load_data, carregar_ativacoes
+from modules.instrumentacao import medir_etapa, etapas_da_execucao, perfilar, iniciar_fragmento
+from modules.multiarquivo import ULTIMA_CARGA
+from modules.ingestao import ULTIMA_COMPACTACAO
+from modules.styles import fontes_ausentes
+
+# Reexecução parcial: st.fragment (>= 1.37), experimental_fragment (1.33-1.36)
+# ou, em versões sem suporte, a própria função (reexecuta a página inteira)
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+def fragmento(funcao):
+    """Decorador de fragmento; cada reexecução só do fragmento é medida como uma execução própria"""
+    if _fragment is None:
+        return funcao
+
+    @functools.wraps(funcao)
+    def executar(*args, **kwargs):
+        iniciar_fragmento(funcao.__name__)
+        return funcao(*args, **kwargs)
+    return _fragment(executar)
+
+# ==================== REGISTRO DE PÁGINAS ====================
+# Cada página declara o módulo da view, a função de renderização e as bases
+# de que precisa. O módulo da view (e o plotly junto) só é importado na
+# primeira visita, e só as bases declaradas são carregadas a cada execução.
+
+BASES = {
+    'faturamento': load_data,
+    'ativacoes': carregar_ativacoes,
+}
+
+PAGINAS = {
+    'previsao': {
+        'icone': 'calendar', 'titulo': 'Previsão de Faturamento',
+        'modulo': 'views.previsao', 'funcao': 'render_previsao',
+        'bases': ('faturamento', 'ativacoes'),
+    },
+    'ativacoes': {
+        'icone': 'users', 'titulo': 'Ativações em Andamento',
+        'modulo': 'views.ativacoes', 'funcao': 'render_ativacoes',
+        'bases': ('ativacoes',),
+    },
+    'mix': {
+        'icone': 'pie_chart', 'titulo': 'Mix de Produtos',
+        'modulo': 'views.mix_produtos', 'funcao': 'render_mix_produtos',
+        'bases': ('faturamento',),
+    },
+    'consolidado': {
+        'icone': 'bar_chart', 'titulo': 'Consolidado & Projeção',
+        'modulo': 'views.consolidado', 'funcao': 'render_consolidado',
+        'bases': ('faturamento', 'ativacoes'),
+    },
+}
+
+# ==================== TEMPOS DE CARREGAMENTO ====================
+# Por processo: import da view na primeira visita e tempo do início da
+# execução do script até o fim da renderização (primeira e última).
+
+TEMPOS_PAGINAS = {}
+
+def _tempos(chave):
+    return TEMPOS_PAGINAS.setdefault(chave, {
+        'import_s': None,
+        'primeira_renderizacao_s': None,
+        'ultima_renderizacao_s': None,
+    })
+
+def carregar_view(chave):
+    """Importa o módulo da página (só na primeira visita) e devolve a função de renderização"""
+    pagina = PAGINAS[chave]
+    tempos = _tempos(chave)
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(pagina['modulo'])
+    if tempos['import_s'] is None:
+        tempos['import_s'] = round(time.perf_counter() - inicio, 4)
+    return getattr(modulo, pagina['funcao'])
+
+def _renderizar(chave):
+    with medir_etapa(f'import {PAGINAS[chave]["modulo"]}'):
+        render = carregar_view(chave)
+    bases = []
+    for nome in PAGINAS[chave]['bases']:
+        with medir_etapa(f'base {nome}'):
+            bases.append(BASES[nome]())
+    with medir_etapa(PAGINAS[chave]['funcao']):
+        render(*bases)
+
+def renderizar_pagina(chave, inicio_execucao):
+    """Carrega só as bases da página, renderiza e registra o tempo até o fim da renderização
+
+    Se pedido no painel de debug, esta execução da página é perfilada.
+    """
+    if st.session_state.pop('perfilar_proxima_execucao', False):
+        with perfilar() as perfil:
+            _renderizar(chave)
+        st.session_state['perfil_execucao'] = dict(perfil, pagina=chave)
+    else:
+        _renderizar(chave)
+
+    decorrido = round(time.perf_counter() - inicio_execucao, 4)
+    tempos = _tempos(chave)
+    if tempos['primeira_renderizacao_s'] is None:
+        tempos['primeira_renderizacao_s'] = decorrido
+    tempos['ultima_renderizacao_s'] = decorrido
+
+# ==================== PAINEL DE DEBUG ====================
+
+def renderizar_painel_debug():
+    """Painel na sidebar com as etapas desta execução, tempos por página e perfil (?debug=1 na URL)"""
+    with st.sidebar.expander("⏱️ Tempos de carregamento"):
+        etapas = pd.DataFrame(etapas_da_execucao())
+        if not etapas.empty:
+            etapas['etapa'] = etapas['nivel'].map(lambda nivel: '\u2003' * nivel) + etapas['etapa']
+            st.caption("Etapas desta execução (ms)")
+            st.dataframe(etapas[['etapa', 'ms', 'inicio_ms']], hide_index=True, use_container_width=True)
+
+        st.caption("Por página")
+        st.dataframe(pd.DataFrame.from_dict(TEMPOS_PAGINAS, orient='index'), use_container_width=True)
+        if ULTIMA_CARGA:
+            st.caption(f"Planilhas: {ULTIMA_CARGA['segundos']}s em {ULTIMA_CARGA['processos']} processo(s)")
+            st.dataframe(pd.DataFrame(ULTIMA_CARGA['planilhas']), use_container_width=True)
+
+        if ULTIMA_COMPACTACAO:
+            st.caption(f"Base em memória: {ULTIMA_COMPACTACAO['antes_mb']} MB → "
+                       f"{ULTIMA_COMPACTACAO['depois_mb']} MB ({ULTIMA_COMPACTACAO['linhas']} linhas)")
+            st.dataframe(pd.DataFrame(ULTIMA_COMPACTACAO['colunas']).T, use_container_width=True)
+        ausentes = fontes_ausentes()
+        if ausentes:
+            st.caption(f"Fontes ausentes em static/fonts (usando Google Fonts ou as do sistema): {', '.join(ausentes)}")
+
+        if st.button("Perfilar próxima execução", use_container_width=True):
+            st.session_state['perfilar_proxima_execucao'] = True
+            st.rerun()
+        perfil = st.session_state.get('perfil_execucao')
+        if perfil:
+            st.caption(f"Perfil ({perfil['ferramenta']}) da página {perfil['pagina']}")
+            st.code(perfil['relatorio'], language=None)
+            st.download_button("⬇️ Baixar perfil", perfil['relatorio'].encode('utf-8'),
+                               file_name=f"perfil_{perfil['pagina']}.txt", mime="text/plain")
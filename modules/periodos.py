@@ -0,0 +1,56 @@
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# ==================== DIMENSÃO DE PERÍODO ====================
+# Cada mês é representado por um ordinal inteiro (ANO * 12 + MÊS - 1).
+# Ordenação, variação MoM e iteração de meses viram aritmética inteira;
+# os rótulos 'MÊS/ANO' ficam só para exibição, vindos do calendário.
+
+MESES_NOME = ['', 'JANEIRO', 'FEVEREIRO', 'MARÇO', 'ABRIL', 'MAIO', 'JUNHO',
+              'JULHO', 'AGOSTO', 'SETEMBRO', 'OUTUBRO', 'NOVEMBRO', 'DEZEMBRO']
+
+MESES_ABREV = ['', 'Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
+               'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+def ordinal_periodo(ano, mes):
+    """Ordinal do mês (aceita escalares, arrays ou Series)"""
+    if isinstance(ano, pd.Series):
+        return (ano * 12 + mes - 1).astype('Int64')
+    return ano * 12 + mes - 1
+
+def ano_mes_do_ordinal(ordinal):
+    """Converte o ordinal de volta em (ANO, MÊS)"""
+    return ordinal // 12, ordinal % 12 + 1
+
+def rotulo_periodo(ordinal):
+    """Rótulo de exibição 'MÊS/ANO' de um ordinal"""
+    ano, mes = ano_mes_do_ordinal(int(ordinal))
+    return f"{MESES_NOME[mes]}/{ano}"
+
+def ordinal_de_datas(datas):
+    """Ordinal do mês de uma Series de datas"""
+    return (datas.dt.year * 12 + datas.dt.month - 1).to_numpy()
+
+@lru_cache(maxsize=128)
+def _calendario_periodos(inicio, fim):
+    """Calendário guardado em cache - compartilhado, não deve sair daqui sem cópia"""
+    ordinais = np.arange(int(inicio), int(fim) + 1)
+    anos, meses = ano_mes_do_ordinal(ordinais)
+    calendario = pd.DataFrame({
+        'PERIODO_ORD': ordinais,
+        'ANO': anos,
+        'MÊS': meses,
+        'Periodo': [f"{MESES_NOME[m]}/{a}" for a, m in zip(anos, meses)],
+        'Periodo_Abrev': [f"{MESES_ABREV[m]}/{a}" for a, m in zip(anos, meses)],
+        'Inicio': pd.to_datetime({'year': anos, 'month': meses, 'day': 1}),
+    })
+    return calendario
+
+def calendario_periodos(inicio, fim):
+    """Tabela de calendário (ordinais de `inicio` a `fim`, inclusive) com os rótulos
+
+    Montada uma vez por intervalo; cada chamada recebe uma cópia própria
+    (poucas linhas), então alterá-la não afeta as chamadas seguintes.
+    """
+    return _calendario_periodos(int(inicio), int(fim)).copy()
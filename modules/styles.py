@@ -1,11 +1,69 @@
+import json
+import os
+import re
+from functools import lru_cache
 import streamlit as st
+import streamlit.components.v1 as components
 from modules.config import COLORS
 
-def apply_premium_css():
-    st.markdown(f"""
-    <style>
-    /* ========== FONTS ========== */
-    @import url('https://fonts.googleapis.com/css2?family=Sora:wght@300;400;500;600;700;800&family=IBM+Plex+Sans:wght@300;400;500;600;700&display=swap');
+# ==================== FONTES LOCAIS ====================
+# Sora e IBM Plex Sans servidas de static/fonts (sem @import do Google Fonts,
+# que bloqueia a renderização e falha nos servidores sem internet). Enquanto
+# faltar algum arquivo em static/fonts, o @import volta a ser usado, como
+# antes: servidores com internet mantêm as fontes e os sem internet caem na
+# fonte instalada (local()) ou no fallback da pilha de font-family. O painel
+# de debug lista os arquivos ausentes (ver static/fonts/README.md).
+
+DIRETORIO_FONTES = os.path.join('static', 'fonts')
+URL_FONTES = 'app/static/fonts'
+
+FONTES_LOCAIS = [
+    ('Sora', '300 800', 'sora-variable.woff2'),
+    ('IBM Plex Sans', '300', 'ibm-plex-sans-300.woff2'),
+    ('IBM Plex Sans', '400', 'ibm-plex-sans-400.woff2'),
+    ('IBM Plex Sans', '500', 'ibm-plex-sans-500.woff2'),
+    ('IBM Plex Sans', '600', 'ibm-plex-sans-600.woff2'),
+    ('IBM Plex Sans', '700', 'ibm-plex-sans-700.woff2'),
+]
+
+def fontes_ausentes():
+    """Arquivos de FONTES_LOCAIS que não estão em static/fonts"""
+    return [arquivo for _, _, arquivo in FONTES_LOCAIS
+            if not os.path.exists(os.path.join(DIRETORIO_FONTES, arquivo))]
+
+URL_GOOGLE_FONTS = ('https://fonts.googleapis.com/css2?family=Sora:wght@300;400;500;600;700;800'
+                    '&family=IBM+Plex+Sans:wght@300;400;500;600;700&display=swap')
+
+def _regras_font_face():
+    # O @import precisa vir antes de qualquer regra da folha
+    regras = [f"\n    @import url('{URL_GOOGLE_FONTS}');"] if fontes_ausentes() else []
+    for familia, peso, arquivo in FONTES_LOCAIS:
+        fontes = [f"local('{familia}')"]
+        if os.path.exists(os.path.join(DIRETORIO_FONTES, arquivo)):
+            fontes.append(f"url('{URL_FONTES}/{arquivo}') format('woff2')")
+        regras.append(f"""
+    @font-face {{
+        font-family: '{familia}';
+        font-style: normal;
+        font-weight: {peso};
+        font-display: swap;
+        src: {', '.join(fontes)};
+    }}""")
+    return ''.join(regras)
+
+# ==================== FOLHA DE ESTILOS ====================
+
+# id do <style> criado no <head>; também identifica o iframe do injetor
+ID_ESTILO = 'premium-css'
+
+# Componente que grava o <style> no <head> e devolve True quando conseguiu
+_injetor = components.declare_component(
+    'injetor_css', path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'injetor_css'))
+
+def _css_premium():
+    """Folha de estilos completa, legível, gerada a partir de COLORS"""
+    return f"""
+    /* ========== FONTS ========== */{_regras_font_face()}
     
     /* ========== GLOBAL ========== */
     * {{
@@ -339,5 +397,49 @@ def apply_premium_css():
         opacity: 0.85;
         margin-top: 0.5rem;
     }}
-    </style>
-    """, unsafe_allow_html=True)
+    /* ========== INJETOR (só o iframe do componente injetor) ========== */
+    .element-container:has(iframe[title="{_injetor.name}"]) {{
+        display: none;
+    }}
+    """
+
+def minificar_css(css):
+    """Remove comentários e espaços desnecessários"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+@lru_cache(maxsize=1)
+def css_premium():
+    """CSS minificado, gerado uma vez por processo"""
+    return minificar_css(_css_premium())
+
+def apply_premium_css():
+    """Injeta o CSS no <head> da página até o navegador confirmar
+
+    O Streamlit remove elementos que não são reenviados numa nova execução,
+    mas o <style> criado no <head> pelo componente continua lá. Depois que o
+    componente confirma a gravação, nada mais é enviado na sessão; se a
+    execução for interrompida antes disso, o injetor volta na seguinte.
+    """
+    if st.session_state.get('css_premium_confirmado'):
+        return
+    if _injetor(css=css_premium(), id=ID_ESTILO, key='injetor_css_premium', default=False):
+        st.session_state.css_premium_confirmado = True
+
+def medir_payload_css():
+    """Bytes do CSS enviados por execução: antes (<style> legível) e agora"""
+    legivel = len(f"<style>{_css_premium()}</style>".encode('utf-8'))
+    injetor = len(json.dumps({'css': css_premium(), 'id': ID_ESTILO}).encode('utf-8'))
+    return {
+        'css_legivel_bytes': legivel,
+        'css_minificado_bytes': len(css_premium().encode('utf-8')),
+        'primeira_execucao_bytes': injetor,
+        'execucoes_seguintes_bytes': 0,
+        'economia_por_execucao_bytes': legivel,
+    }
+
+if __name__ == '__main__':
+    print(json.dumps(medir_payload_css(), indent=2))
@@ -0,0 +1,68 @@
+import numpy as np
+import streamlit as st
+
+# ==================== TABELAS HTML VETORIZADAS ====================
+# Componente único para as tabelas HTML das views. Cada célula é montada
+# com operações elemento a elemento sobre arrays de objetos (sem iterrows),
+# e o HTML final sai de um único join.
+
+def _atributo(nome, valores, n):
+    """Array com ' nome="valor"' por linha (vazio quando o valor é vazio)"""
+    if valores is None:
+        return np.full(n, '', dtype=object)
+    if np.isscalar(valores):
+        return np.full(n, f" {nome}='{valores}'" if valores else '', dtype=object)
+    valores = np.asarray(valores, dtype=object)
+    return np.where(valores == '', '', f" {nome}='" + valores + "'")
+
+def _textos(df, coluna, formatador):
+    """Textos de exibição de uma coluna, via formatador vetorizado (Series -> strings)"""
+    serie = df[coluna]
+    if formatador is not None:
+        return np.asarray(formatador(serie), dtype=object)
+    return serie.astype(str).to_numpy(dtype=object)
+
+def montar_tabela_html(df, colunas=None, cabecalhos=None, formatadores=None,
+                       classes_celula=None, estilos_celula=None, classes_linha=None,
+                       classe_tabela='', classe_container=None, css=''):
+    """Monta uma tabela HTML a partir de um DataFrame
+
+    - `formatadores`: {coluna: função(Series) -> strings}, aplicada à coluna inteira
+    - `classes_celula` / `estilos_celula`: {coluna: valor único ou array por linha}
+    - `classes_linha`: valor único ou array com a classe de cada <tr>
+    """
+    colunas = list(df.columns if colunas is None else colunas)
+    cabecalhos = list(colunas if cabecalhos is None else cabecalhos)
+    formatadores = formatadores or {}
+    classes_celula = classes_celula or {}
+    estilos_celula = estilos_celula or {}
+    n = len(df)
+
+    linhas = '<tr' + _atributo('class', classes_linha, n) + '>'
+    for coluna in colunas:
+        abertura = ('<td' + _atributo('class', classes_celula.get(coluna), n)
+                    + _atributo('style', estilos_celula.get(coluna), n) + '>')
+        linhas = linhas + abertura + _textos(df, coluna, formatadores.get(coluna)) + '</td>'
+    linhas = linhas + '</tr>'
+
+    partes = [css]
+    if classe_container:
+        partes.append(f'<div class="{classe_container}">')
+    partes.append(f'<table class="{classe_tabela}">' if classe_tabela else '<table>')
+    partes.append('<thead><tr>' + ''.join(f'<th>{c}</th>' for c in cabecalhos) + '</tr></thead><tbody>')
+    partes.extend(linhas if n else [])
+    partes.append('</tbody></table>')
+    if classe_container:
+        partes.append('</div>')
+    return ''.join(partes)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def renderizar_tabela_html(df, colunas=None, cabecalhos=None,
+                           classes_celula=None, estilos_celula=None, classes_linha=None,
+                           classe_tabela='', classe_container=None, css=''):
+    """`montar_tabela_html` memoizado pelo hash do conteúdo das entradas
+
+    Funções não são hasheáveis pelo cache: as colunas devem chegar já formatadas.
+    """
+    return montar_tabela_html(df, colunas, cabecalhos, None, classes_celula,
+                              estilos_celula, classes_linha, classe_tabela, classe_container, css)
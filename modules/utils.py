@@ -1,17 +1,10 @@
-import base64
 import unicodedata
-import calendar
+from functools import lru_cache
+from itertools import repeat
+import numpy as np
 import pandas as pd
 from modules.config import COLORS
 
-def load_logo():
-    """Carrega a logo da Base Telco"""
-    try:
-        with open("logo.gif", "rb") as f:
-            return base64.b64encode(f.read()).decode()
-    except:
-        return None
-
 def format_currency(value):
     """Formata valor como moeda brasileira"""
     try:
@@ -33,6 +26,76 @@ def format_percentage(value):
     except:
         return "0.0%"
 
+# ==================== FORMATAÇÃO VETORIZADA ====================
+# Mesma saída das versões escalares para valores numéricos, aplicada a uma
+# Series/array inteira: cada valor distinto é formatado uma vez, tudo num único
+# `join`, os separadores são trocados com um único `translate` e o texto é
+# separado de volta. Valores nulos ou não numéricos recebem `na_rep` (as
+# versões escalares não tratam NaN explicitamente).
+
+_SEPARADORES_BRL = str.maketrans({',': '.', '.': ','})
+
+def _fatorar(validos):
+    """Códigos e valores distintos; em floats compara os bits, para -0.0 não virar 0.0"""
+    if validos.dtype == np.float64:
+        codigos, distintos = pd.factorize(validos.view(np.int64))
+        return codigos, distintos.view(np.float64)
+    return pd.factorize(validos)
+
+def _truncar_como_int(valores):
+    """Trunca como `int`: int64 quando cabe, int do Python acima disso e ±inf como está (igual a `format_number`)"""
+    truncados = np.trunc(valores)
+    cabe = np.abs(truncados) < 2.0 ** 63
+    if cabe.all():
+        return truncados.astype(np.int64)
+    saida = truncados.astype(object)
+    saida[cabe] = truncados[cabe].astype(np.int64)
+    grandes = ~cabe & np.isfinite(truncados)
+    saida[grandes] = [int(v) for v in truncados[grandes]]
+    return saida
+
+def _formatar_em_lote(valores, padrao, prefixo, sufixo, na_rep, converter=None, traducao=None):
+    """Formata todos os valores com `padrao` e devolve no mesmo formato da entrada"""
+    if isinstance(valores, pd.Series):
+        numeros = pd.to_numeric(valores, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        forma = None
+    else:
+        bruto = np.asarray(valores)
+        numeros = pd.to_numeric(bruto.ravel(), errors='coerce').astype(float)
+        forma = bruto.shape
+
+    nulos = np.isnan(numeros)
+    validos = numeros[~nulos]
+    if converter is not None:
+        validos = converter(validos)
+
+    textos = np.full(len(numeros), na_rep, dtype=object)
+    if len(validos):
+        codigos, distintos = _fatorar(validos)
+        juntos = '\n'.join(map(format, distintos.tolist(), repeat(padrao)))
+        if traducao is not None:
+            juntos = juntos.translate(traducao)
+        formatados = (prefixo + juntos.replace('\n', sufixo + '\n' + prefixo) + sufixo).split('\n')
+        textos[~nulos] = np.array(formatados, dtype=object)[codigos]
+
+    if forma is None:
+        return pd.Series(textos, index=valores.index, name=valores.name)
+    return textos.reshape(forma)
+
+def format_currency_serie(valores, na_rep="R$ 0,00"):
+    """Formata uma Series/array inteira como moeda brasileira"""
+    return _formatar_em_lote(valores, ',.2f', 'R$ ', '', na_rep, traducao=_SEPARADORES_BRL)
+
+def format_number_serie(valores, na_rep="0"):
+    """Formata uma Series/array inteira com separador de milhares (truncando como `int`)"""
+    return _formatar_em_lote(valores, ',', '', '', na_rep,
+                             converter=_truncar_como_int,
+                             traducao=str.maketrans(',', '.'))
+
+def format_percentage_serie(valores, na_rep="0.0%"):
+    """Formata uma Series/array inteira como percentual"""
+    return _formatar_em_lote(valores, '.1f', '', '%', na_rep)
+
 def get_color_by_growth(value):
     """Retorna cor baseada no crescimento"""
     if value > 5:
@@ -43,8 +106,12 @@ def get_color_by_growth(value):
         return COLORS['danger']
 
 def normalizar_nome_cliente(nome):
-    """Normaliza nome de cliente para matching entre bases"""
-    nome = str(nome).upper().strip()
+    """Normaliza nome de cliente para matching entre bases (memoizado)"""
+    return _normalizar_texto_cliente(str(nome))
+
+@lru_cache(maxsize=65536)
+def _normalizar_texto_cliente(nome):
+    nome = nome.upper().strip()
     nome = unicodedata.normalize('NFD', nome)
     nome = ''.join(char for char in nome if unicodedata.category(char) != 'Mn')
     nome = nome.replace('.', '').replace(',', '').replace('-', '').replace('/', '')
@@ -52,11 +119,38 @@ def normalizar_nome_cliente(nome):
     mapeamento = {'INTERCEMENT': 'INTERCEMENT', 'KOMECO': 'KOMECO', 'SEBRAE': 'SEBRAE'}
     return mapeamento.get(nome, nome)
 
+def normalizar_serie_clientes(serie):
+    """Normaliza uma coluna inteira de nomes, uma vez por valor distinto"""
+    codigos, distintos = pd.factorize(serie, use_na_sentinel=False)
+    chaves = pd.Index(distintos).map(normalizar_nome_cliente)
+    return pd.Series(chaves.to_numpy(dtype=object)[codigos], index=serie.index, name='CLIENTE_KEY')
+
 def calcular_valor_proporcional(data_ativacao, valor_mrr):
     """Calcula valor proporcional baseado nos dias restantes do mês"""
-    data = pd.to_datetime(data_ativacao)
-    dias_no_mes = calendar.monthrange(data.year, data.month)[1]
-    dias_cobrados = dias_no_mes - data.day
-    if dias_cobrados <= 0:
-        return 0.0
-    return (valor_mrr / dias_no_mes) * dias_cobrados
+    return float(calcular_valor_proporcional_serie([data_ativacao], [valor_mrr])[0])
+
+def calcular_valor_proporcional_serie(datas_ativacao, valores_mrr, ano=None, mes=None):
+    """Valor proporcional de cada ativação no mês de entrada, para colunas inteiras
+
+    Dias do mês e dia da ativação saem de aritmética de datetime64 do NumPy.
+    Com `ano` e `mes`, só as ativações daquele mês recebem o proporcional; as
+    demais (e datas nulas) ficam com 0.0. Devolve Series se `datas_ativacao` for Series.
+    """
+    brutas = datas_ativacao.to_numpy() if isinstance(datas_ativacao, pd.Series) else datas_ativacao
+    datas = pd.DatetimeIndex(pd.to_datetime(brutas)).to_numpy().astype('datetime64[D]')
+    mrr = np.asarray(valores_mrr, dtype=float)
+    inicio_mes = datas.astype('datetime64[M]')
+
+    dias_no_mes = ((inicio_mes + 1).astype('datetime64[D]') - inicio_mes.astype('datetime64[D]')).astype(np.int64)
+    dia = (datas - inicio_mes.astype('datetime64[D]')).astype(np.int64) + 1
+    dias_cobrados = dias_no_mes - dia
+
+    cobrar = ~np.isnat(datas) & (dias_cobrados > 0)
+    if ano is not None and mes is not None:
+        cobrar &= inicio_mes == np.datetime64(f'{int(ano):04d}-{int(mes):02d}', 'M')
+
+    proporcional = np.zeros(len(datas), dtype=float)
+    proporcional[cobrar] = (mrr[cobrar] / dias_no_mes[cobrar]) * dias_cobrados[cobrar]
+    if isinstance(datas_ativacao, pd.Series):
+        return pd.Series(proporcional, index=datas_ativacao.index)
+    return proporcional
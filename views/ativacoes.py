@@ -1,9 +1,12 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
+import numpy as np
 from datetime import datetime
 from modules.config import ICONS, COLORS
-from modules.utils import format_currency
+from modules.utils import format_currency, format_currency_serie
+from modules.tabelas import renderizar_tabela_html
+from modules.instrumentacao import medir_etapa
 
 def render_ativacoes(df_ativacoes):
     """Renderiza a página de Ativações em Andamento"""
@@ -29,7 +32,8 @@ def render_ativacoes(df_ativacoes):
     ticket_medio = mrr_total / total_ativacoes if total_ativacoes > 0 else 0
     
     data_atual = datetime.now()
-    df_ativacoes['DIAS_ATE_ATIVACAO'] = (df_ativacoes['DATA_PREVISTA'] - pd.Timestamp(data_atual)).dt.days
+    # Coluna derivada numa cópia: a base recebida não é alterada
+    df_ativacoes = df_ativacoes.assign(DIAS_ATE_ATIVACAO=(df_ativacoes['DATA_PREVISTA'] - pd.Timestamp(data_atual)).dt.days)
     proximos_30_dias = len(df_ativacoes[df_ativacoes['DIAS_ATE_ATIVACAO'] <= 30])
     
     # Cards com gradiente
@@ -101,17 +105,16 @@ def render_ativacoes(df_ativacoes):
     # Preparar dados
     df_exibir = df_filtrado[['CLIENTE', 'PRODUTO', 'DATA_PREVISTA', 'VALOR_MRR', 'STATUS', 'DIAS_ATE_ATIVACAO']].copy()
     df_exibir['DATA_PREVISTA_FMT'] = df_exibir['DATA_PREVISTA'].dt.strftime('%d/%m/%Y')
-    df_exibir['VALOR_MRR_FMT'] = df_exibir['VALOR_MRR'].apply(format_currency)
-    
-    def get_urgencia(dias):
-        if dias < 0:
-            return ('🔴 Atrasado', '#FEE2E2', '#DC2626')
-        elif dias <= 7:
-            return ('🟡 Urgente', '#FEF3C7', '#F59E0B')
-        elif dias <= 30:
-            return ('🟢 Próximo', '#D1FAE5', '#059669')
-        else:
-            return ('⚪ Futuro', '#F1F5F9', '#64748B')
+    df_exibir['VALOR_MRR_FMT'] = format_currency_serie(df_exibir['VALOR_MRR'])
+    
+    # Urgência calculada para todas as linhas de uma vez
+    dias = df_exibir['DIAS_ATE_ATIVACAO']
+    faixas = [dias < 0, dias <= 7, dias <= 30]
+    urgencia_texto = np.select(faixas, ['🔴 Atrasado', '🟡 Urgente', '🟢 Próximo'], '⚪ Futuro').astype(object)
+    bg_color = np.select(faixas, ['#FEE2E2', '#FEF3C7', '#D1FAE5'], '#F1F5F9').astype(object)
+    text_color = np.select(faixas, ['#DC2626', '#F59E0B', '#059669'], '#64748B').astype(object)
+    df_exibir['URGENCIA_HTML'] = ("<span class='badge-urgencia' style='background:" + bg_color
+                                  + ";color:" + text_color + ";'>" + urgencia_texto + "</span>")
     
     # Construir HTML - MÉTODO QUE FUNCIONA
     css = """
@@ -172,26 +175,16 @@ def render_ativacoes(df_ativacoes):
     </style>
     """
     
-    html = css + '<div class="table-ativ-container"><table class="table-ativ">'
-    html += '<thead><tr>'
-    html += '<th>CLIENTE</th><th>PRODUTO</th><th>DATA PREVISTA</th>'
-    html += '<th>VALOR MRR</th><th>STATUS</th><th>URGÊNCIA</th>'
-    html += '</tr></thead><tbody>'
-    
-    for _, row in df_exibir.iterrows():
-        urgencia_texto, bg_color, text_color = get_urgencia(row['DIAS_ATE_ATIVACAO'])
-        html += '<tr>'
-        html += f"<td>{row['CLIENTE']}</td>"
-        html += f"<td>{row['PRODUTO']}</td>"
-        html += f"<td>{row['DATA_PREVISTA_FMT']}</td>"
-        html += f"<td style='font-weight:600;color:#059669;'>{row['VALOR_MRR_FMT']}</td>"
-        html += f"<td>{row['STATUS']}</td>"
-        html += f"<td><span class='badge-urgencia' style='background:{bg_color};color:{text_color};'>{urgencia_texto}</span></td>"
-        html += '</tr>'
-    
-    html += '</tbody></table></div>'
-    
-    components.html(html, height=650, scrolling=True)
+    with medir_etapa('tabela ativações'):
+        html = renderizar_tabela_html(
+            df_exibir[['CLIENTE', 'PRODUTO', 'DATA_PREVISTA_FMT', 'VALOR_MRR_FMT', 'STATUS', 'URGENCIA_HTML']],
+            cabecalhos=['CLIENTE', 'PRODUTO', 'DATA PREVISTA', 'VALOR MRR', 'STATUS', 'URGÊNCIA'],
+            estilos_celula={'VALOR_MRR_FMT': 'font-weight:600;color:#059669;'},
+            classe_tabela='table-ativ',
+            classe_container='table-ativ-container',
+            css=css
+        )
+        components.html(html, height=650, scrolling=True)
 
     st.markdown("---")
 
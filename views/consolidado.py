@@ -1,12 +1,17 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-from modules.config import ICONS, COLORS, CORES_SERVICOS
-from modules.utils import format_currency, format_percentage, get_color_by_growth
-from modules.data_loader import gerar_previsao_com_ativacoes, carregar_ativacoes
-
-def render_consolidado(df):
+from modules.config import ICONS, COLORS, CORES_SERVICOS, HORIZONTE_PREVISAO_MESES, CENARIOS_PADRAO
+from modules.utils import format_currency, format_currency_serie, format_percentage, get_color_by_growth
+from modules.paginas import fragmento
+from modules.instrumentacao import medir_etapa
+from modules.data_loader import obter_previsao, obter_cubo, obter_cenarios, obter_monte_carlo
+from modules.cubo import consultar_cubo, total_cubo, distintos_cubo
+from modules.tabelas import renderizar_tabela_html
+
+def render_consolidado(df, df_ativacoes):
     """Renderiza a página de Consolidado & Projeção - EXATO DO ORIGINAL"""
     
     st.markdown(f"""
@@ -24,25 +29,22 @@ def render_consolidado(df):
         st.warning("⚠️ Nenhum dado disponível.")
         return
     
+    cubo = obter_cubo(df)
+
     # Métricas principais
-    faturamento_total = df['Vlr Valido'].sum()
-    qtd_clientes = df['GRUPO CLIENTE'].nunique()
+    faturamento_total = total_cubo(cubo)
+    qtd_clientes = distintos_cubo(cubo, 'GRUPO CLIENTE')
     
+    # Faturamento por período, em ordem cronológica (ordinal)
+    df_periodos = consultar_cubo(cubo, ['PERIODO_ORD', 'Periodo'])
+
     # Último período
-    ultimo_periodo = df.sort_values(['ANO', 'MÊS']).iloc[-1]['Periodo']
-    faturamento_ultimo_mes = df[df['Periodo'] == ultimo_periodo]['Vlr Valido'].sum()
-    
-    # Penúltimo período para calcular crescimento
-    periodos_ordenados = sorted(df['Periodo'].unique())
-    if len(periodos_ordenados) >= 2:
-        penultimo_periodo = periodos_ordenados[-2]
-        faturamento_penultimo_mes = df[df['Periodo'] == penultimo_periodo]['Vlr Valido'].sum()
-        crescimento = ((faturamento_ultimo_mes / faturamento_penultimo_mes) - 1) * 100 if faturamento_penultimo_mes > 0 else 0
-    else:
-        crescimento = 3.0
+    ultimo_periodo = df_periodos['Periodo'].iloc[-1]
+    faturamento_ultimo_mes = df_periodos['Vlr Valido'].iloc[-1]
 
-    # Projeção próximo mês
-    previsao_prox_mes = faturamento_ultimo_mes * 1.03
+    # Projeção próximo mês: primeiro mês da previsão (último mês por cliente + ativações)
+    previsao_prox_mes = obter_previsao(df, df_ativacoes, 1)['Valor'].sum()
+    crescimento = ((previsao_prox_mes / faturamento_ultimo_mes) - 1) * 100 if faturamento_ultimo_mes > 0 else 0
     ticket_medio = faturamento_total / qtd_clientes if qtd_clientes > 0 else 0
 
     # Cards principais
@@ -50,7 +52,8 @@ def render_consolidado(df):
 
     cards_data = [
         (col1, COLORS['secondary'], COLORS['accent'], 'Faturamento Total', faturamento_total, 'Acumulado', 'dollar'),
-        (col2, COLORS['warning'], COLORS['danger'], 'Previsão Próximo Mês', previsao_prox_mes, f'+{format_percentage(crescimento)}', 'trending_up'),
+        (col2, COLORS['warning'], COLORS['danger'], 'Previsão Próximo Mês', previsao_prox_mes,
+         f"{'+' if crescimento >= 0 else ''}{format_percentage(crescimento)}", 'trending_up'),
         (col3, COLORS['info'], COLORS['secondary'], 'Clientes Ativos', qtd_clientes, ultimo_periodo, 'users'),
         (col4, COLORS['accent'], COLORS['success'], 'Ticket Médio', ticket_medio, 'por cliente', 'credit_card')
     ]
@@ -75,6 +78,18 @@ def render_consolidado(df):
 
     st.markdown("---")
 
+    secao_projecao(df, df_ativacoes)
+
+    st.markdown("---")
+
+    secao_cenarios(df, df_ativacoes)
+
+@fragmento
+@medir_etapa('secao_projecao')
+def secao_projecao(df, df_ativacoes):
+    """Configuração, gráficos e resumo da projeção - reexecutados sozinhos ao mover o slider"""
+    cubo = obter_cubo(df)
+
     # Configuração de projeção
     col1, col2 = st.columns([4, 2])
     with col1:
@@ -84,22 +99,23 @@ def render_consolidado(df):
             </div>
         """, unsafe_allow_html=True)
     with col2:
-        meses_projecao = st.slider("Meses para projetar", 3, 12, 6)
+        meses_projecao = st.slider("Meses para projetar", 3, HORIZONTE_PREVISAO_MESES, 6)
+        simular_risco = st.toggle(
+            "Faixa de risco das ativações", value=False, disabled=df_ativacoes.empty,
+            help="Simulação Monte Carlo da ocorrência e do atraso de cada ativação, pelo STATUS (faixa P10-P90)")
 
     # Gerar dados históricos + projeção
-    df_historico = df.groupby(['MÊS', 'ANO', 'Periodo'])['Vlr Valido'].sum().reset_index()
-    df_historico = df_historico.sort_values(['ANO', 'MÊS'])
+    df_historico = consultar_cubo(cubo, ['PERIODO_ORD', 'MÊS', 'ANO', 'Periodo'])
     df_historico['Tipo'] = 'Realizado'
 
     # Gerar projeção total
-    df_ativacoes_cons = carregar_ativacoes()
-    df_previsao_total = gerar_previsao_com_ativacoes(df, df_ativacoes_cons, meses_projecao)
-    df_proj_agregado = df_previsao_total.groupby(['Periodo', 'MÊS', 'ANO'])['Valor'].sum().reset_index()
+    df_previsao_total = obter_previsao(df, df_ativacoes, meses_projecao)
+    df_proj_agregado = df_previsao_total.groupby(['PERIODO_ORD', 'Periodo', 'MÊS', 'ANO'], observed=True)['Valor'].sum().reset_index()
     df_proj_agregado['Tipo'] = 'Projetado'
-    df_proj_agregado.columns = ['Periodo', 'MÊS', 'ANO', 'Vlr Valido', 'Tipo']
+    df_proj_agregado.columns = ['PERIODO_ORD', 'Periodo', 'MÊS', 'ANO', 'Vlr Valido', 'Tipo']
 
     # Combinar
-    df_completo = pd.concat([df_historico[['Periodo', 'MÊS', 'ANO', 'Vlr Valido', 'Tipo']], 
+    df_completo = pd.concat([df_historico[['PERIODO_ORD', 'Periodo', 'MÊS', 'ANO', 'Vlr Valido', 'Tipo']], 
                             df_proj_agregado], ignore_index=True)
 
     # Gráfico de linha temporal
@@ -124,6 +140,36 @@ def render_consolidado(df):
         fillcolor=f"rgba(5, 150, 105, 0.1)"
     ))
 
+    # Faixa P10-P90 da simulação de risco, ligada ao último mês realizado
+    if simular_risco and not df_ativacoes.empty and not df_real.empty:
+        faixas = obter_monte_carlo(df, df_ativacoes, meses_projecao)
+        ultimo_real = df_real.iloc[-1]
+        periodos_faixa = [ultimo_real['Periodo']] + faixas['Periodo'].tolist()
+        fig.add_trace(go.Scatter(
+            x=periodos_faixa,
+            y=[ultimo_real['Vlr Valido']] + faixas['P90'].tolist(),
+            mode='lines',
+            name='P90',
+            line=dict(width=0),
+            showlegend=False
+        ))
+        fig.add_trace(go.Scatter(
+            x=periodos_faixa,
+            y=[ultimo_real['Vlr Valido']] + faixas['P10'].tolist(),
+            mode='lines',
+            name='Faixa P10-P90',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor="rgba(245, 158, 11, 0.2)"
+        ))
+        fig.add_trace(go.Scatter(
+            x=periodos_faixa,
+            y=[ultimo_real['Vlr Valido']] + faixas['P50'].tolist(),
+            mode='lines',
+            name='Mediana (P50)',
+            line=dict(color=COLORS['warning'], width=1.5, dash='dot')
+        ))
+
     # Linha projetada
     df_proj = df_completo[df_completo['Tipo'] == 'Projetado']
     if not df_proj.empty and not df_real.empty:
@@ -161,7 +207,8 @@ def render_consolidado(df):
         font=dict(family='IBM Plex Sans')
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    with medir_etapa('gráfico evolução e projeção'):
+        st.plotly_chart(fig, use_container_width=True)
 
     # Gráfico de área empilhado por serviço
     st.markdown(f"""
@@ -170,11 +217,11 @@ def render_consolidado(df):
         </div>
     """, unsafe_allow_html=True)
 
-    df_servicos = df.groupby(['Periodo', 'tpServ'])['Vlr Valido'].sum().reset_index()
+    df_servicos = consultar_cubo(cubo, ['PERIODO_ORD', 'Periodo', 'tpServ'])
 
     fig = go.Figure()
 
-    for servico in sorted(df['tpServ'].unique()):
+    for servico in sorted(cubo['tpServ'].dropna().unique()):
         df_serv = df_servicos[df_servicos['tpServ'] == servico]
         fig.add_trace(go.Scatter(
             x=df_serv['Periodo'],
@@ -196,7 +243,8 @@ def render_consolidado(df):
         font=dict(family='IBM Plex Sans')
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    with medir_etapa('gráfico por serviço'):
+        st.plotly_chart(fig, use_container_width=True)
 
     # Tabela resumo
     st.markdown(f"""
@@ -206,14 +254,11 @@ def render_consolidado(df):
     """, unsafe_allow_html=True)
 
     df_resumo = df_completo.copy()
-    df_resumo = df_resumo.sort_values(['ANO', 'MÊS'])
+    df_resumo = df_resumo.sort_values('PERIODO_ORD', kind='stable')
     df_resumo['Variacao'] = df_resumo['Vlr Valido'].pct_change() * 100
 
-    # Gerar HTML completo
-    html_resumo = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
+    # Gerar HTML (colunas de exibição calculadas para a tabela inteira)
+    css_resumo = f"""
     <style>
         body {{
             margin: 0;
@@ -274,51 +319,144 @@ def render_consolidado(df):
             color: {COLORS['warning']};
         }}
     </style>
-    </head>
-    <body>
-    <table class='resumo-table'>
-        <thead>
-            <tr>
-                <th>Período</th>
-                <th>Tipo</th>
-                <th>Faturamento</th>
-                <th>Variação MoM</th>
-            </tr>
-        </thead>
-        <tbody>
     """
 
-    for _, row in df_resumo.iterrows():
-        tipo_classe = 'tipo-real' if row['Tipo'] == 'Realizado' else 'tipo-proj'
-        badge_classe = 'badge-real' if row['Tipo'] == 'Realizado' else 'badge-proj'
-        variacao = row['Variacao']
+    realizado = (df_resumo['Tipo'] == 'Realizado').to_numpy()
+    variacao = df_resumo['Variacao']
+    cor_variacao = np.select([variacao > 5, variacao > 0], [COLORS['success'], COLORS['warning']], COLORS['danger']).astype(object)
+    df_resumo['Variacao_HTML'] = np.where(
+        variacao.notna(),
+        "<span style='color: " + cor_variacao + "; font-weight: 700;'>" + variacao.map('{:+.1f}%'.format).to_numpy(dtype=object) + "</span>",
+        "<span style='color: #9CA3AF;'>—</span>"
+    )
+    df_resumo['Tipo_HTML'] = (np.where(realizado, "<span class='badge badge-real'>", "<span class='badge badge-proj'>")
+                              .astype(object) + df_resumo['Tipo'].to_numpy(dtype=object) + '</span>')
+
+    df_resumo['Valor_FMT'] = format_currency_serie(df_resumo['Vlr Valido'])
+
+    with medir_etapa('tabela resumo'):
+        tabela_resumo = renderizar_tabela_html(
+            df_resumo[['Periodo', 'Tipo_HTML', 'Valor_FMT', 'Variacao_HTML']],
+            cabecalhos=['Período', 'Tipo', 'Faturamento', 'Variação MoM'],
+            estilos_celula={
+                'Periodo': f"font-weight: 600; color: {COLORS['primary']};",
+                'Valor_FMT': 'font-weight: 600; font-family: Sora;'
+            },
+            classes_linha=np.where(realizado, 'tipo-real', 'tipo-proj'),
+            classe_tabela='resumo-table'
+        )
+        html_resumo = f"<!DOCTYPE html><html><head>{css_resumo}</head><body>{tabela_resumo}</body></html>"
+
+        altura_resumo = min(600, len(df_resumo) * 50 + 100)
+        components.html(html_resumo, height=altura_resumo, scrolling=True)
+
+# Cor de cada cenário, pela posição na tabela (Pessimista, Base, Otimista, ...)
+CORES_CENARIOS = [COLORS['danger'], COLORS['secondary'], COLORS['success'], COLORS['warning'],
+                  COLORS['video'], COLORS['accent'], COLORS['ip'], COLORS['gray']]
+
+@fragmento
+@medir_etapa('secao_cenarios')
+def secao_cenarios(df, df_ativacoes):
+    """Comparação de cenários de previsão - reexecutada sozinha ao editar a tabela de cenários"""
+    cubo = obter_cubo(df)
 
-        if pd.notna(variacao):
-            if variacao > 5:
-                cor_variacao = COLORS['success']
-            elif variacao > 0:
-                cor_variacao = COLORS['warning']
-            else:
-                cor_variacao = COLORS['danger']
-            variacao_str = f"<span style='color: {cor_variacao}; font-weight: 700;'>{variacao:+.1f}%</span>"
-        else:
-            variacao_str = "<span style='color: #9CA3AF;'>—</span>"
-
-        html_resumo += f"""
-        <tr class='{tipo_classe}'>
-            <td style='font-weight: 600; color: {COLORS['primary']};'>{row['Periodo']}</td>
-            <td><span class='badge {badge_classe}'>{row['Tipo']}</span></td>
-            <td style='font-weight: 600; font-family: Sora;'>{format_currency(row['Vlr Valido'])}</td>
-            <td>{variacao_str}</td>
-        </tr>
-        """
-
-    html_resumo += """
-        </tbody>
-    </table>
-    </body>
-    </html>
-    """
+    st.markdown(f"""
+        <div class='section-title'>
+            {ICONS['target']} Comparação de Cenários
+        </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2 = st.columns([4, 2])
+    with col1:
+        cenarios = st.data_editor(
+            pd.DataFrame(CENARIOS_PADRAO),
+            num_rows='dynamic',
+            hide_index=True,
+            use_container_width=True,
+            key='cenarios_consolidado',
+            column_config={
+                'Cenário': st.column_config.TextColumn('Cenário', required=True),
+                'Crescimento': st.column_config.NumberColumn(
+                    'Crescimento (% a.m.)', help='Crescimento mensal composto da receita atual', format='%.1f%%', min_value=-99.9, step=0.1),
+                'Atraso': st.column_config.NumberColumn(
+                    'Atraso (meses)', help='Meses somados à data prevista das ativações', min_value=0, max_value=HORIZONTE_PREVISAO_MESES, step=1),
+                'Churn': st.column_config.NumberColumn(
+                    'Churn (% a.m.)', help='Perda mensal composta da receita atual', format='%.1f%%', min_value=0.0, max_value=100.0, step=0.1),
+            }
+        )
+    with col2:
+        meses_cenarios = st.slider("Meses dos cenários", 3, HORIZONTE_PREVISAO_MESES, HORIZONTE_PREVISAO_MESES)
 
-    altura_resumo = min(600, len(df_resumo) * 50 + 100)
-    components.html(html_resumo, height=altura_resumo, scrolling=True)
\ No newline at end of file
+    try:
+        df_cenarios = obter_cenarios(df, df_ativacoes, cenarios, meses_cenarios)
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        return
+
+    if df_cenarios.empty:
+        st.info("Adicione ao menos um cenário à tabela.")
+        return
+
+    nomes = list(pd.unique(df_cenarios['Cenário']))
+    df_historico = consultar_cubo(cubo, ['PERIODO_ORD', 'Periodo']).tail(meses_cenarios)
+    ultimo_real = df_historico.iloc[-1]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=df_historico['Periodo'],
+        y=df_historico['Vlr Valido'],
+        mode='lines+markers',
+        name='Faturamento Realizado',
+        line=dict(color=COLORS['gray'], width=3),
+        marker=dict(size=8)
+    ))
+
+    for posicao, nome in enumerate(nomes):
+        df_cenario = df_cenarios[df_cenarios['Cenário'] == nome]
+        fig.add_trace(go.Scatter(
+            x=[ultimo_real['Periodo']] + df_cenario['Periodo'].tolist(),
+            y=[ultimo_real['Vlr Valido']] + df_cenario['Valor'].tolist(),
+            mode='lines+markers',
+            name=nome,
+            line=dict(color=CORES_CENARIOS[posicao % len(CORES_CENARIOS)], width=2.5, dash='dash'),
+            marker=dict(size=6, symbol='diamond')
+        ))
+
+    fig.update_layout(
+        height=450,
+        xaxis_title="Período",
+        yaxis_title="Faturamento (R$)",
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        font=dict(family='IBM Plex Sans')
+    )
+
+    with medir_etapa('gráfico cenários'):
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Resumo por cenário, comparado ao cenário Base (ou ao primeiro da tabela)
+    por_cenario = df_cenarios.groupby('Cenário', sort=False)['Valor']
+    resumo = pd.DataFrame({
+        'Próximo mês': por_cenario.first(),
+        'Último mês': por_cenario.last(),
+        'Total no período': por_cenario.sum(),
+    }).reindex(nomes)
+    referencia = 'Base' if 'Base' in nomes else nomes[0]
+    total_referencia = resumo.loc[referencia, 'Total no período']
+
+    tabela = pd.DataFrame({col: format_currency_serie(resumo[col]) for col in resumo.columns}, index=resumo.index)
+    if total_referencia:
+        variacao = (resumo['Total no período'] / total_referencia - 1) * 100
+        tabela[f'vs {referencia}'] = variacao.map('{:+.1f}%'.format)
+    else:
+        # Referência sem receita no período: variação percentual indefinida
+        tabela[f'vs {referencia}'] = '—'
+    st.dataframe(tabela, use_container_width=True)
@@ -2,7 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from modules.config import ICONS, COLORS, CORES_SERVICOS
-from modules.utils import format_currency, format_percentage
+from modules.utils import format_currency, format_currency_serie, format_percentage
+from modules.data_loader import obter_cubo
+from modules.cubo import consultar_cubo
+from modules.instrumentacao import medir_etapa
 
 def render_mix_produtos(df):
     """Renderiza a página de Mix de Produtos - EXATO DO ORIGINAL"""
@@ -22,8 +25,10 @@ def render_mix_produtos(df):
         st.warning("⚠️ Nenhum dado disponível.")
         return
     
+    cubo = obter_cubo(df)
+
     # Agrupar por serviço
-    df_servicos = df.groupby('tpServ')['Vlr Valido'].sum().reset_index()
+    df_servicos = consultar_cubo(cubo, ['tpServ'])
     df_servicos = df_servicos.sort_values('Vlr Valido', ascending=False)
     df_servicos['Percentual'] = (df_servicos['Vlr Valido'] / df_servicos['Vlr Valido'].sum()) * 100
 
@@ -85,7 +90,8 @@ def render_mix_produtos(df):
             font=dict(family='IBM Plex Sans')
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        with medir_etapa('gráfico distribuição'):
+            st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         st.markdown(f"""
@@ -103,7 +109,7 @@ def render_mix_produtos(df):
             marker=dict(
                 color=[CORES_SERVICOS.get(s, COLORS['gray']) for s in df_servicos['tpServ']]
             ),
-            text=[format_currency(v) for v in df_servicos['Vlr Valido']],
+            text=format_currency_serie(df_servicos['Vlr Valido']).tolist(),
             textposition='outside',
             hovertemplate='<b>%{y}</b><br>%{text}<extra></extra>'
         ))
@@ -122,7 +128,8 @@ def render_mix_produtos(df):
             font=dict(family='IBM Plex Sans')
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        with medir_etapa('gráfico ranking'):
+            st.plotly_chart(fig, use_container_width=True)
 
     # Evolução por serviço
     st.markdown(f"""
@@ -131,11 +138,11 @@ def render_mix_produtos(df):
         </div>
     """, unsafe_allow_html=True)
 
-    df_evolucao = df.groupby(['Periodo', 'tpServ'])['Vlr Valido'].sum().reset_index()
+    df_evolucao = consultar_cubo(cubo, ['PERIODO_ORD', 'Periodo', 'tpServ'])
 
     fig = go.Figure()
 
-    for servico in sorted(df['tpServ'].unique()):
+    for servico in sorted(cubo['tpServ'].dropna().unique()):
         df_serv = df_evolucao[df_evolucao['tpServ'] == servico]
         fig.add_trace(go.Scatter(
             x=df_serv['Periodo'],
@@ -163,5 +170,6 @@ def render_mix_produtos(df):
         font=dict(family='IBM Plex Sans')
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    with medir_etapa('gráfico evolução por serviço'):
+        st.plotly_chart(fig, use_container_width=True)
 